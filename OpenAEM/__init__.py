@@ -1,5 +1,24 @@
 from .attached_eddy import (pi_packet, lambda_packet, plot_eddy, mirror_eddy)
 from .line import (Line, DLS)
-from .biot_savart import (biot_savart, biot_savart_eddy)
+from .spline import Spline
+from .eddy_geometry import EddyGeometry
+from .backends import (set_backend, get_backend, register_backend,
+                       available_backends)
+from .biot_savart import (biot_savart, biot_savart_eddy, biot_savart_segment,
+                          biot_savart_grid)
+from .eddy_template import EddyTemplate
+from .synthesis import (synthesize, truncation_error, influence_reach)
+from .probes import probe_series
+from .inflow import FrozenTurbulence
+from .lazy_field import VelocityField
+from .statistics import (RunningMoments, RunningSpectra,
+                         ensemble_statistics)
+from .diagnostics import (vorticity, q_criterion, dissipation)
+from .tree_code import (SegmentTree, biot_savart_tree)
+from .fft_synthesis import (FFTSynthesizer, fft_synthesize)
+from .parallel import parallel_field
+from .field_io import (stream_field, open_field)
+from .intensity import intensity_function
 from .wall_patch import Wall_Patch
-from .velocity_field import get_grid
\ No newline at end of file
+from .velocity_field import (get_grid, get_stretched_grid, grid_vectors,
+                             iter_grid_slabs)
\ No newline at end of file
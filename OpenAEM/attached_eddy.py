@@ -1,40 +1,46 @@
 import numpy as np
 
 from OpenAEM.line import DLS
+from OpenAEM.eddy_geometry import EddyGeometry
 
 def pi_packet(l=0.4, alpha=10.0, n=7, beta=45.0):
-    eddy = []
-    
     alpha = np.deg2rad(alpha)
     beta = np.deg2rad(beta)
-    heights = np.array([1.0 - i*l*np.tan(alpha) for i in range(n)])
-    for i in range(n):
-        p0 = np.array([-i*l, -heights[i]*0.5, 0])
-        p1 = np.array([-i*l + heights[i]*np.tan(beta), -heights[i]*0.5, heights[i]])
-        p2 = np.array([-i*l + heights[i]*np.tan(beta), heights[i]*0.5, heights[i]])
-        p3 = np.array([-i*l, heights[i]*0.5, 0])
-        eddy.append(DLS(p0, p1))
-        eddy.append(DLS(p1, p2))
-        eddy.append(DLS(p2, p3))
-        
-    return eddy
+    x = -np.arange(n)*l
+    heights = 1.0 - np.arange(n)*l*np.tan(alpha)
+    xh = x + heights*np.tan(beta)
+    
+    # corners of each pi vortex (3, n)
+    p0 = np.vstack((x,  -heights*0.5, np.zeros(n)))
+    p1 = np.vstack((xh, -heights*0.5, heights))
+    p2 = np.vstack((xh,  heights*0.5, heights))
+    p3 = np.vstack((x,   heights*0.5, np.zeros(n)))
+    
+    # segments ordered as p0->p1, p1->p2, p2->p3 for each vortex
+    starts = np.stack((p0, p1, p2), axis=2).reshape(3, -1)
+    ends   = np.stack((p1, p2, p3), axis=2).reshape(3, -1)
+    return EddyGeometry(starts, ends)
 
 def lambda_packet(l=0.4, alpha=10.0, n=7, beta=45.0):
-    eddy = []
-    
     alpha = np.deg2rad(alpha)
     beta = np.deg2rad(beta)
-    heights = np.array([1.0 - i*l*np.tan(alpha) for i in range(n)])
-    for i in range(n):
-        p0 = np.array([-i*l, -heights[i]*0.5, 0])
-        p1 = np.array([-i*l + heights[i]*np.tan(beta), 0.0, heights[i]])
-        p2 = np.array([-i*l, heights[i]*0.5, 0])
-        eddy.append(DLS(p0, p1))
-        eddy.append(DLS(p1, p2))
-        
-    return eddy
+    x = -np.arange(n)*l
+    heights = 1.0 - np.arange(n)*l*np.tan(alpha)
+    
+    # corners of each lambda vortex (3, n)
+    p0 = np.vstack((x, -heights*0.5, np.zeros(n)))
+    p1 = np.vstack((x + heights*np.tan(beta), np.zeros(n), heights))
+    p2 = np.vstack((x,  heights*0.5, np.zeros(n)))
+    
+    # segments ordered as p0->p1, p1->p2 for each vortex
+    starts = np.stack((p0, p1), axis=2).reshape(3, -1)
+    ends   = np.stack((p1, p2), axis=2).reshape(3, -1)
+    return EddyGeometry(starts, ends)
 
 def mirror_eddy(eddy:list[DLS]):
+    if isinstance(eddy, EddyGeometry):
+        return eddy.mirror().reverse()
+    
     mirror = []
     for line in eddy:
         mirror.append(line.mirror().reverse())
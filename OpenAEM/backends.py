@@ -0,0 +1,209 @@
+import os
+import importlib.util
+import numpy as np
+
+# numba is imported on first use of its backend, it also loads scipy
+_numba_installed = importlib.util.find_spec('numba') is not None
+# parallel loop of the fused kernel, numba.prange once compiled
+_prange = range
+_fused_segments_jit = None
+
+def numpy_segments(xv, p0, p1, r0, gamma=1.0):
+    """summed closed-form velocity of S straight segments
+
+    Args:
+        xv (float ndarray): (3, M) location request
+        p0 (ndarray): (3, S) starting points
+        p1 (ndarray): (3, S) ending points
+        r0 (float or ndarray): cutoff radius, scalar or (S,)
+        gamma (float or ndarray, optional): (S,) relative circulation.
+            Defaults to 1.0.
+
+    Returns:
+        float ndarray: (3, M) induced velocity at xv
+    """
+    r1 = xv[:, :, np.newaxis] - p0[:, np.newaxis, :] # (3, M, S)
+    r2 = xv[:, :, np.newaxis] - p1[:, np.newaxis, :]
+    l  = (p1 - p0)[:, np.newaxis, :]
+
+    c  = np.cross(r1, r2, axis=0)
+    c2 = np.sum(c*c, axis=0)
+    valid = c2 > r0**2*np.sum(l*l, axis=0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        e = r1/np.linalg.norm(r1, axis=0) - r2/np.linalg.norm(r2, axis=0)
+        coef = np.where(valid, 0.5*gamma*np.sum(l*e, axis=0)/c2, 0.0)
+
+    return np.sum(c*coef, axis=2)
+
+def numpy_segments_gradient(xv, p0, p1, r0, gamma=1.0):
+    """numpy_segments together with the velocity gradient
+
+    Returns:
+        tuple: ((3, M) velocity, (3, 3, M) gradient du_i/dx_k)
+
+    Formulas:
+        u = 1/2 gamma c phi/A,  c = r1 X r2 = l X r1,  A = |c|^2
+        phi = l.(r1/|r1| - r2/|r2|)
+        du_i/dx_k = 1/2 gamma ([l]x_ik phi/A + c_i dphi_k/A - c_i phi dA_k/A^2)
+        dA = 2 c X l,  dphi = (l - (l.e1) e1)/|r1| - (l - (l.e2) e2)/|r2|
+        with e1, e2 the unit vectors of r1, r2
+    """
+    r1 = xv[:, :, np.newaxis] - p0[:, np.newaxis, :] # (3, M, S)
+    r2 = xv[:, :, np.newaxis] - p1[:, np.newaxis, :]
+    l  = (p1 - p0)[:, np.newaxis, :]
+
+    c  = np.cross(r1, r2, axis=0)
+    c2 = np.sum(c*c, axis=0)
+    valid = c2 > r0**2*np.sum(l*l, axis=0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        n1 = np.linalg.norm(r1, axis=0); e1 = r1/n1
+        n2 = np.linalg.norm(r2, axis=0); e2 = r2/n2
+        phi = np.sum(l*(e1 - e2), axis=0)
+        dphi = ((l - np.sum(l*e1, axis=0)*e1)/n1
+                - (l - np.sum(l*e2, axis=0)*e2)/n2)
+        dA = 2*np.cross(c, l, axis=0)
+        alpha = np.where(valid, 0.5*gamma*phi/c2, 0.0) # (M, S)
+        beta  = np.where(valid, 0.5*gamma/c2, 0.0)
+        w = beta*(dphi - phi*dA/c2) # (3, M, S)
+    w = np.where(valid, w, 0.0)
+
+    uvv = np.sum(c*alpha, axis=2)
+    v = np.sum(l*alpha, axis=2) # sum of alpha l, enters as [v]x
+    grad = np.einsum('ims,kms->ikm', c, w)
+    grad[0, 1] -= v[2]; grad[0, 2] += v[1]
+    grad[1, 0] += v[2]; grad[1, 2] -= v[0]
+    grad[2, 0] -= v[1]; grad[2, 1] += v[0]
+    return uvv, grad
+
+def float32_segments(xv, p0, p1, r0, gamma=1.0):
+    """numpy_segments in single precision
+
+    The coordinates are shifted to the centre of the segments in double
+    precision before the cast, so the error does not grow with the distance
+    from the origin. Temporaries take half the memory of numpy_segments.
+
+    Returns:
+        float ndarray: (3, M) induced velocity at xv, float64
+
+    Remarks:
+        with eps = 6e-8 the relative error of each segment is about
+        10 eps (1 + d/l) for a point at distance d of a segment of length l,
+        i.e. below 1e-5 within 10 segment lengths. Points near the cutoff
+        radius may switch between zero and non-zero velocity.
+    """
+    pts = np.hstack((p0, p1))
+    centre = 0.5*(pts.min(axis=1) + pts.max(axis=1))[:, np.newaxis]
+    single = lambda a: np.asarray(a, dtype=np.float32)
+    uvv = numpy_segments(single(xv - centre), single(p0 - centre),
+                         single(p1 - centre), single(r0), single(gamma))
+    return uvv.astype(float)
+
+def _fused_segments(xv, p0, p1, r0, gamma, out):
+    """fused loop over points and segments without temporaries, compiled by
+    numba_segments and plain Python otherwise"""
+    for m in _prange(xv.shape[1]):
+        u0 = 0.0; u1 = 0.0; u2 = 0.0
+        for k in range(p0.shape[1]):
+            r1x = xv[0, m] - p0[0, k]; r1y = xv[1, m] - p0[1, k]; r1z = xv[2, m] - p0[2, k]
+            r2x = xv[0, m] - p1[0, k]; r2y = xv[1, m] - p1[1, k]; r2z = xv[2, m] - p1[2, k]
+            lx = p1[0, k] - p0[0, k]; ly = p1[1, k] - p0[1, k]; lz = p1[2, k] - p0[2, k]
+            cx = r1y*r2z - r1z*r2y
+            cy = r1z*r2x - r1x*r2z
+            cz = r1x*r2y - r1y*r2x
+            c2 = cx*cx + cy*cy + cz*cz
+            if c2 <= r0[k]**2*(lx*lx + ly*ly + lz*lz):
+                continue
+            n1 = np.sqrt(r1x*r1x + r1y*r1y + r1z*r1z)
+            n2 = np.sqrt(r2x*r2x + r2y*r2y + r2z*r2z)
+            coef = 0.5*gamma[k]*(lx*(r1x/n1 - r2x/n2) + ly*(r1y/n1 - r2y/n2)
+                                 + lz*(r1z/n1 - r2z/n2))/c2
+            u0 += cx*coef; u1 += cy*coef; u2 += cz*coef
+        out[0, m] = u0; out[1, m] = u1; out[2, m] = u2
+
+def _compiled_segments():
+    """_fused_segments compiled with numba, cached on disk"""
+    global _prange, _fused_segments_jit
+    if _fused_segments_jit is None:
+        import numba
+        _prange = numba.prange
+        _fused_segments_jit = numba.njit(parallel=True, cache=True)(_fused_segments)
+    return _fused_segments_jit
+
+def numba_segments(xv, p0, p1, r0, gamma=1.0):
+    """numpy_segments as a fused loop compiled with numba, only available
+    when numba is installed
+
+    Returns:
+        float ndarray: (3, M) induced velocity at xv
+
+    Remarks:
+        a process that forks (e.g. the process pools of parallel_field)
+        after the numba thread pool has started may hang at exit with the
+        tbb threading layer, set NUMBA_THREADING_LAYER=workqueue or omp
+    """
+    S = p0.shape[1]
+    out = np.empty(xv.shape)
+    _compiled_segments()(np.ascontiguousarray(xv, dtype=float),
+                         np.ascontiguousarray(p0, dtype=float),
+                         np.ascontiguousarray(p1, dtype=float),
+                         np.ascontiguousarray(np.broadcast_to(r0, (S,)), dtype=float),
+                         np.ascontiguousarray(np.broadcast_to(gamma, (S,)), dtype=float),
+                         out)
+    return out
+
+# name -> kernel of the installed backends
+_backends = {'numpy': numpy_segments, 'float32': float32_segments}
+if _numba_installed:
+    _backends['numba'] = numba_segments
+# name -> package of the optional backends
+_optional = {'numba': 'numba'}
+_current  = os.environ.get('OPENAEM_BACKEND', 'numpy')
+
+def register_backend(name, kernel):
+    """add a segment kernel with the signature of numpy_segments
+
+    Args:
+        name (str): backend name
+        kernel (callable): (xv, p0, p1, r0, gamma) -> (3, M) velocity
+    """
+    _backends[name] = kernel
+
+def available_backends():
+    """names of the registered backends, optional ones only if installed"""
+    return sorted(_backends)
+
+def set_backend(name):
+    """select the backend used when no backend is passed
+
+    The default is 'numpy', or the OPENAEM_BACKEND environment variable.
+
+    Args:
+        name (str): 'numpy', 'float32', 'numba' or a registered name
+
+    Returns:
+        str: the previous backend
+    """
+    get_backend(name)
+    global _current
+    previous, _current = _current, name
+    return previous
+
+def get_backend(name=None):
+    """segment kernel of a backend
+
+    Args:
+        name (str, optional): backend name. Defaults to None (the current
+            backend, see set_backend).
+
+    Returns:
+        callable: kernel with the signature of numpy_segments
+    """
+    name = _current if name is None else name
+    if name not in _backends and name in _optional:
+        raise ImportError(f'backend {name} needs {_optional[name]}, which is '
+                          'not installed')
+    if name not in _backends:
+        raise ValueError(f'unknown backend: {name}')
+    return _backends[name]
@@ -1,8 +1,201 @@
 import numpy as np
-from scipy import integrate
-from OpenAEM.line import DLS
+from OpenAEM.line import Line, DLS
+from OpenAEM.eddy_geometry import EddyGeometry
+from OpenAEM.backends import get_backend, numpy_segments_gradient
+from OpenAEM.velocity_field import grid_shape, grid_points
 
-def biot_savart(xv, curve: DLS, r0 = 0.1):
+# bytes of temporaries allowed per batched Biot-Savart evaluation
+DEFAULT_MEMORY_BUDGET = 2**27
+
+# Gauss-Legendre nodes per panel and largest number of panels of the
+# adaptive quadrature
+GAUSS_ORDER = 8
+MAX_PANELS  = 1024
+
+def biot_savart_segment(xv, p0, p1, r0=0.1, backend=None):
+    """closed-form induced velocity of a straight vortex segment
+    Evaluate the Biot-Savart integral of a straight segment exactly
+
+                 1   r1 X r2
+     u_v(x) =    - ----------- l.(r1/|r1| - r2/|r2|)
+                 2 |r1 X r2|^2
+
+    with r1 = x - p0, r2 = x - p1 and l = p1 - p0. It is the limit of the
+    quadrature in biot_savart as ds -> 0.
+
+    Args:
+        xv (float ndarray): (3,) or (3, M) location request
+        p0 (ndarray): (3,) starting point
+        p1 (ndarray): (3,) ending point
+        r0 (float, optional): cutoff radius. Defaults to 0.1.
+        backend (str, optional): kernel backend, see set_backend. Defaults
+            to None (the current backend).
+
+    Returns:
+        float ndarray: (3,) or (3, M) induced velocity at xv
+
+    Remarks:
+        |r1 X r2|/|l| is the distance to the line, so points within r0 of
+        the line get zero velocity at no extra cost
+    """
+    xv = np.asarray(xv, dtype=float)
+    single = xv.ndim == 1
+    p0 = np.asarray(p0, dtype=float).reshape(3, 1)
+    p1 = np.asarray(p1, dtype=float).reshape(3, 1)
+    uvv = _segments_velocity(xv.reshape(3, -1), p0, p1, r0, backend=backend)
+
+    return uvv[:, 0] if single else uvv
+
+def _segments_velocity(xv, p0, p1, r0, gamma=1.0, backend=None):
+    """summed closed-form velocity of S straight segments
+
+    Args:
+        xv (float ndarray): (3, M) location request
+        p0 (ndarray): (3, S) starting points
+        p1 (ndarray): (3, S) ending points
+        r0 (float): cutoff radius
+        gamma (float or ndarray, optional): (S,) relative circulation.
+            Defaults to 1.0.
+        backend (str, optional): kernel backend. Defaults to None (the
+            current backend).
+
+    Returns:
+        float ndarray: (3, M) induced velocity at xv
+    """
+    return get_backend(backend)(xv, p0, p1, r0, gamma)
+
+def _quadrature_velocity(xv, curve, r0):
+    """Simpson's rule over the samples of a general curve
+
+    Args:
+        xv (float ndarray): (3, M) location request
+        curve (Line): a general curve with required API implemented
+        r0 (float): cutoff radius
+
+    Returns:
+        float ndarray: (3, M) induced velocity at xv
+    """
+    # if distance <= r0, the line vortex concept is invalid
+    # return zero velocity
+    uvv = np.zeros_like(xv)
+    valid = curve.distance2pts(xv) > r0
+
+    xpv  = curve.points()
+    xpvd = curve.dirs()
+
+    sv = xv[:, valid, np.newaxis] - xpv[:, np.newaxis, :] # (3, M, n)
+    s  = np.linalg.norm(sv, axis=0)
+    f  = np.cross(sv, xpvd[:, np.newaxis, :], axis=0)/s**3
+    if hasattr(curve, 'weights'):
+        # precomputed Simpson weights of DLS
+        uvv[:, valid] = -0.5*(f @ curve.weights())
+    else:
+        from scipy import integrate
+        uvv[:, valid] = -0.5*integrate.simpson(f, x=curve.get_t())
+    return uvv
+
+def _quadrature_gradient(xv, curve, r0):
+    """_quadrature_velocity together with the velocity gradient
+
+    Returns:
+        tuple: ((3, M) velocity, (3, 3, M) gradient du_i/dx_k)
+
+    Formulas:
+        du_i/dx_k = -1/2 int e_ikm x'_m/s^3 - 3 (s X x')_i s_k/s^5 dt
+    """
+    from scipy import integrate
+    uvv  = np.zeros_like(xv)
+    grad = np.zeros((3, 3, xv.shape[1]))
+    valid = curve.distance2pts(xv) > r0
+    t = curve.get_t()
+
+    xpvd = curve.dirs()[:, np.newaxis, :]
+    sv = xv[:, valid, np.newaxis] - curve.points()[:, np.newaxis, :]
+    s  = np.linalg.norm(sv, axis=0)
+    f  = np.cross(sv, xpvd, axis=0)
+    uvv[:, valid] = -0.5*integrate.simpson(f/s**3, x=t)
+
+    g = 1.5*integrate.simpson(f[:, np.newaxis]*sv[np.newaxis, :]/s**5, x=t)
+    w = -0.5*integrate.simpson(xpvd/s**3, x=t) # enters as e_ikm w_m
+    g[0, 1] += w[2]; g[0, 2] -= w[1]
+    g[1, 0] -= w[2]; g[1, 2] += w[0]
+    g[2, 0] += w[1]; g[2, 1] -= w[0]
+    grad[:, :, valid] = g
+    return uvv, grad
+
+def _adaptive_velocity(xv, curve, r0, tol, memory_budget=DEFAULT_MEMORY_BUDGET):
+    """Gauss-Legendre panels chosen per point from its distance to the curve
+
+    A point at distance d gets P panels of GAUSS_ORDER nodes so that the
+    Bernstein ellipse of every panel reaches d, which bounds the error of
+    each panel by about tol. Far points need a single panel, points near the
+    curve get many. Points are grouped by P, rounded up to a power of two,
+    and panels are split at the knots of piecewise curves.
+
+    Args:
+        xv (float ndarray): (3, M) location request
+        curve (Line): a curve with position(t) and tangent(t) on [0, 1]
+        r0 (float): cutoff radius
+        tol (float): target relative error
+        memory_budget (int, optional): bytes allowed for temporaries.
+            Defaults to DEFAULT_MEMORY_BUDGET.
+
+    Returns:
+        float ndarray: (3, M) induced velocity at xv
+
+    Formulas:
+        rho = tol^(-1/(2n)),  P = ceil(L (rho^2 - 1)/(4 rho d))
+    """
+    uvv = np.zeros_like(xv)
+    valid = np.nonzero(curve.distance2pts(xv) > r0)[0]
+    if valid.size == 0:
+        return uvv
+
+    rho = tol**(-1/(2*GAUSS_ORDER))
+    ratio = (rho**2 - 1)/(2*rho)
+    d = _curve_distance(xv[:, valid], curve)
+    panels = np.ceil(_curve_length(curve)*ratio/(2*np.maximum(d, 1e-300)))
+    panels = np.minimum(np.maximum(panels, 1), MAX_PANELS)
+    panels = 2**np.ceil(np.log2(panels)).astype(int)
+
+    # panels never straddle the knots of a piecewise curve (e.g. Spline)
+    knots = getattr(curve, 'knots', np.array([0.0, 1.0]))
+    x, w = np.polynomial.legendre.leggauss(GAUSS_ORDER)
+    for npanel in np.unique(panels):
+        edges = np.concatenate([np.linspace(a, b, int(np.ceil(npanel*(b - a))) + 1)[:-1]
+                                for a, b in zip(knots[:-1], knots[1:])] + [[1.0]])
+        half = 0.5*np.diff(edges)
+        mid  = edges[:-1] + half
+        t = (mid[:, np.newaxis] + half[:, np.newaxis]*x).ravel()
+        weights = (half[:, np.newaxis]*w).ravel()
+        xpv = curve.position(t); xpvd = curve.tangent(t)
+
+        group = valid[panels == npanel]
+        size = max(int(memory_budget // (_SAMPLE_BYTES*t.size)), 1)
+        for start in range(0, group.size, size):
+            pts = group[start:start + size]
+            sv = xv[:, pts, np.newaxis] - xpv[:, np.newaxis, :] # (3, m, n)
+            s  = np.linalg.norm(sv, axis=0)
+            f  = np.cross(sv, xpvd[:, np.newaxis, :], axis=0)/s**3
+            uvv[:, pts] = -0.5*(f @ weights)
+    return uvv
+
+def _curve_length(curve):
+    if hasattr(curve, 'get_length'):
+        return curve.get_length()
+    return np.linalg.norm(curve.get_dir())
+
+def _curve_distance(xv, curve):
+    """distance to the curve itself, not to its extension"""
+    if not isinstance(curve, Line):
+        return curve.distance2pts(xv)
+    l = curve.get_dir()[:, np.newaxis]
+    r = xv - curve.get_p0()[:, np.newaxis]
+    t = np.clip(np.sum(r*l, axis=0)/np.sum(l*l), 0.0, 1.0)
+    return np.linalg.norm(r - t*l, axis=0)
+
+def biot_savart(xv, curve: DLS, r0 = 0.1, method='auto', tol=1e-6,
+                backend=None):
     """apply biot savart law to compute induced velocity
     Compute the following integral
 
@@ -12,36 +205,207 @@ def biot_savart(xv, curve: DLS, r0 = 0.1):
                  2 |     s^3
                  --
     Args:
-        xv (float ndarray): location request
+        xv (float ndarray): (3,) or (3, M) location request
         curve (Line): a general curve with required API implemented
+        r0 (float, optional): cutoff radius. Defaults to 0.1.
+        method (str, optional): 'exact' for the closed-form segment kernel,
+            'quadrature' for Simpson's rule over the curve samples,
+            'adaptive' for Gauss-Legendre panels chosen per point or 'auto'
+            (exact for Line/DLS, quadrature otherwise). Defaults to 'auto'.
+        tol (float, optional): target relative error of 'adaptive'.
+            Defaults to 1e-6.
+        backend (str, optional): kernel backend of 'exact', see
+            set_backend. Defaults to None (the current backend).
 
     Returns:
-        float array: (3,) induced velocity at xv
+        float array: (3,) or (3, M) induced velocity at xv
         
     Remarks:
         the circulation has the same direction as the curve
     """
-    # if distance <= r0, the line vortex concept is invalid
-    # return zero velocity
-    if curve.distance2pt(xv) <= r0:
-        return np.zeros(3)
-    
-    xpv  = curve.points()
-    xpvd = curve.dirs()
-    t = curve.get_t()
-    
-    sv  = xv.reshape(-1, 1) - xpv
-    s   = np.linalg.norm(sv, axis=0)
-    uvv = -0.5*integrate.simpson(np.cross(sv, xpvd, axis=0)/s**3, t)
-    return uvv
-    
-def biot_savart_eddy(xv, eddy: list[DLS], r0 = 0.1):
-    uvv = np.zeros(3)
-    for curve in eddy:
-        uvv += biot_savart(xv, curve, r0=r0)
-        
-    return uvv
+    if method == 'auto':
+        method = 'exact' if isinstance(curve, Line) else 'quadrature'
+
+    if method == 'exact':
+        return biot_savart_segment(xv, curve.get_p0(), curve.get_p1(), r0=r0,
+                                   backend=backend)
+    elif method not in ('quadrature', 'adaptive'):
+        raise ValueError(f'unknown Biot-Savart method: {method}')
+
+    xv = np.asarray(xv, dtype=float)
+    single = xv.ndim == 1
+    if method == 'adaptive':
+        uvv = _adaptive_velocity(xv.reshape(3, -1), curve, r0, tol)
+    else:
+        uvv = _quadrature_velocity(xv.reshape(3, -1), curve, r0)
+    return uvv[:, 0] if single else uvv
     
+def biot_savart_eddy(xv, eddy: list[DLS], r0 = 0.1, out=None,
+                     memory_budget=DEFAULT_MEMORY_BUDGET, backend=None,
+                     image=False, gradient=False):
+    """induced velocity of an eddy at a batch of points
+
+    Straight segments (Line/DLS) are gathered once and summed with the
+    closed-form kernel, other curves use quadrature. Points are processed in
+    chunks so that the temporaries stay within memory_budget.
+
+    Args:
+        xv (float ndarray): (3,) or (3, M) location request
+        eddy (EddyGeometry or list[DLS]): eddy geometry
+        r0 (float, optional): cutoff radius. Defaults to 0.1.
+        out (float ndarray, optional): preallocated output with the shape
+            of xv, any memory layout. Defaults to None.
+        memory_budget (int, optional): bytes allowed for temporaries.
+            Defaults to DEFAULT_MEMORY_BUDGET.
+        backend (str, optional): kernel backend of the straight segments,
+            see set_backend. Defaults to None (the current backend).
+        image (bool, optional): add the wall image of the eddy in z = 0
+            without building it, see _eddy_velocity. Defaults to False.
+        gradient (bool, optional): also return the velocity gradient,
+            computed analytically in the same pass with the NumPy kernel.
+            Defaults to False.
+
+    Returns:
+        float ndarray: (3,) or (3, M) induced velocity at xv, and with
+            gradient the (3, 3) or (3, 3, M) tensor du_i/dx_k
+    """
+    xv = np.asarray(xv, dtype=float)
+    if out is None:
+        out = np.empty(xv.shape)
+    grad = np.empty((3,) + xv.shape) if gradient else None
+    # reshape copies a non-contiguous out, fill a contiguous buffer instead
+    buf = out if out.flags.c_contiguous else np.empty(out.shape)
+    uvv = buf.reshape(3, -1)
+    xv  = xv.reshape(3, -1)
+
+    segments = _gather_segments(eddy)
+    for start, stop in _chunks(xv.shape[1], segments, memory_budget, image,
+                               gradient):
+        _eddy_velocity(xv[:, start:stop], segments, r0, uvv[:, start:stop],
+                       backend, image,
+                       grad.reshape(3, 3, -1)[:, :, start:stop] if gradient else None)
+
+    if buf is not out:
+        out[...] = buf
+    return (out, grad) if gradient else out
+
+def biot_savart_grid(grid, eddy: list[DLS], r0=0.1, out=None,
+                     memory_budget=DEFAULT_MEMORY_BUDGET, backend=None,
+                     image=False, gradient=False):
+    """induced velocity of an eddy on a grid
+
+    Args:
+        grid (tuple[ndarray]): (X, Y, Z) arrays of the same shape, e.g. from
+            velocity_field.get_grid, or (x, y, z) 1d vectors of a
+            tensor-product grid, e.g. from velocity_field.get_stretched_grid
+        eddy (EddyGeometry or list[DLS]): eddy geometry
+        r0 (float, optional): cutoff radius. Defaults to 0.1.
+        out (float ndarray, optional): preallocated (3, *X.shape) output,
+            any memory layout. Defaults to None.
+        memory_budget (int, optional): bytes allowed for temporaries.
+            Defaults to DEFAULT_MEMORY_BUDGET.
+        backend (str, optional): kernel backend of the straight segments,
+            see set_backend. Defaults to None (the current backend).
+        image (bool, optional): add the wall image of the eddy in z = 0
+            without building it, see _eddy_velocity. Defaults to False.
+        gradient (bool, optional): also return the velocity gradient, see
+            biot_savart_eddy. Defaults to False.
+
+    Returns:
+        float ndarray: (3, *X.shape) velocity, unpack as U, V, W, and with
+            gradient the (3, 3, *X.shape) tensor du_i/dx_k, where X.shape is
+            (nx, ny, nz) for 1d vectors
+
+    Remarks:
+        with 1d vectors only the points of the current chunk are built, the
+        meshgrid is never stored
+    """
+    shape = grid_shape(grid)
+    if out is None:
+        out = np.empty((3,) + shape)
+    grad = np.empty((3, 3) + shape) if gradient else None
+    buf = out if out.flags.c_contiguous else np.empty(out.shape)
+    uvv = buf.reshape(3, -1)
+
+    segments = _gather_segments(eddy)
+    for start, stop in _chunks(int(np.prod(shape)), segments, memory_budget,
+                               image, gradient):
+        xv = grid_points(grid, start, stop)
+        _eddy_velocity(xv, segments, r0, uvv[:, start:stop], backend, image,
+                       grad.reshape(3, 3, -1)[:, :, start:stop] if gradient else None)
+
+    if buf is not out:
+        out[...] = buf
+    return (out, grad) if gradient else out
+
+# bytes of temporaries per (point, segment) and per (point, sample) pair
+_SEGMENT_BYTES = 160
+_SAMPLE_BYTES  = 160
+
+def _gather_segments(eddy):
+    """split an eddy into stacked straight segments and general curves
+
+    Returns:
+        tuple: (p0 (3, S), p1 (3, S), gamma (S,), list of remaining curves)
+    """
+    if isinstance(eddy, EddyGeometry):
+        return eddy.p0, eddy.p1, eddy.gamma, []
+
+    lines  = [curve for curve in eddy if isinstance(curve, Line)]
+    curves = [curve for curve in eddy if not isinstance(curve, Line)]
+    segments = EddyGeometry.from_segments(lines)
+    return segments.p0, segments.p1, segments.gamma, curves
+
+def _chunks(npts, segments, memory_budget, image=False, gradient=False):
+    """(start, stop) ranges of points whose temporaries fit memory_budget"""
+    p0, _, _, curves = segments
+    nsamples = max([np.size(curve.get_t()) for curve in curves], default=0)
+    per_point = max(_SEGMENT_BYTES*p0.shape[1], _SAMPLE_BYTES*nsamples, 1)
+    per_point *= 2 if image else 1
+    per_point *= 3 if gradient else 1
+    size = max(int(memory_budget // per_point), 1)
+    for start in range(0, npts, size):
+        yield start, min(start + size, npts)
+
+# reflection in the wall z = 0
+MIRROR = np.array([1.0, 1.0, -1.0])
+
+def _eddy_velocity(xv, segments, r0, out, backend=None, image=False,
+                   grad=None):
+    """velocity of the gathered segments and curves at xv
+
+    With image, the eddy is evaluated once at the points and their mirror
+    images in a single kernel call, instead of adding the mirrored and
+    reversed copy (mirror_eddy) to the geometry. The (3, 3, M) gradient is
+    written to grad if given.
+
+    Formulas:
+        u_image(x) = M u(M x),  grad u_image(x) = M grad u(M x) M
+        M = diag(1, 1, -1)
+    """
+    if image:
+        m = xv.shape[1]
+        both = np.empty((3, 2*m))
+        both_grad = None if grad is None else np.empty((3, 3, 2*m))
+        _eddy_velocity(np.hstack((xv, MIRROR[:, np.newaxis]*xv)), segments,
+                       r0, both, backend, grad=both_grad)
+        out[:] = both[:, :m] + MIRROR[:, np.newaxis]*both[:, m:]
+        if grad is not None:
+            grad[:] = both_grad[:, :, :m] + (MIRROR[:, np.newaxis, np.newaxis]
+                                             *both_grad[:, :, m:]*MIRROR[:, np.newaxis])
+        return
+    p0, p1, gamma, curves = segments
+    if grad is None:
+        out[:] = _segments_velocity(xv, p0, p1, r0, gamma=gamma, backend=backend)
+        for curve in curves:
+            out += _quadrature_velocity(xv, curve, r0)
+        return
+
+    out[:], grad[:] = numpy_segments_gradient(xv, p0, p1, r0, gamma)
+    for curve in curves:
+        u, g = _quadrature_gradient(xv, curve, r0)
+        out += u; grad += g
+
 if __name__ == '__main__':
     import OpenAEM
     xvp0 = np.array([0, 0, -50000])
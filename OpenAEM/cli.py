@@ -0,0 +1,202 @@
+import os
+import sys
+import json
+import argparse
+
+# run description, every section of a config file is merged into these
+DEFAULT_CONFIG = {
+    'grid': {'Retau': 1000.0, 'dxp': 20.0, 'Lx': 2.0, 'Ly': 1.0, 'Lz': 1.0,
+             'h': 1.0},
+    'eddy': {'packet': 'lambda'},
+    'placement': {'heights': [1.0, 0.5, 0.25, 0.125], 'lam': 1.0,
+                  'radius': None, 'periodic': False},
+    'synthesis': {'r0': 0.1, 'influence_radius': 4.0, 'image': False},
+    'seed': 0,
+    'output': 'field.npy',
+    'tile': 1,
+}
+
+def main(argv=None):
+    """openaem console command
+
+    Args:
+        argv (list[str], optional): arguments. Defaults to None (sys.argv).
+
+    Returns:
+        int: exit status
+    """
+    args = _parser().parse_args(argv)
+    if args.command == 'example':
+        print(json.dumps(DEFAULT_CONFIG, indent=4))
+        return 0
+    try:
+        config = load_config(args.config)
+        output = _output_path(args.config, config, args.output)
+        if args.command == 'status':
+            print(status(output))
+            return 0
+        run(config, output, restart=args.restart)
+        print(status(output))
+        return 0
+    except (OSError, ValueError, KeyError, TypeError) as error:
+        print(f'openaem: error: {error}', file=sys.stderr)
+        return 2
+
+def load_config(path):
+    """read a JSON run description and fill in the defaults
+
+    Args:
+        path (str): JSON file, see DEFAULT_CONFIG and `openaem example`
+
+    Returns:
+        dict: complete run description
+    """
+    with open(path) as f:
+        user = json.load(f)
+    unknown = set(user) - set(DEFAULT_CONFIG)
+    if unknown:
+        raise ValueError(f'unknown config entries: {sorted(unknown)}')
+    config = json.loads(json.dumps(DEFAULT_CONFIG))
+    for key, value in user.items():
+        if isinstance(config[key], dict):
+            config[key].update(value)
+        else:
+            config[key] = value
+    return config
+
+def build_grid(config):
+    """(x, y, z) grid vectors, from get_grid or, with a 'stretching' entry,
+    from get_stretched_grid"""
+    from OpenAEM.velocity_field import get_grid, get_stretched_grid
+    grid = dict(config['grid'])
+    if 'stretching' in grid:
+        return get_stretched_grid(**grid)
+    return get_grid(vectors=True, **grid)
+
+def build_eddy(config):
+    """unit eddy from lambda_packet or pi_packet"""
+    from OpenAEM.attached_eddy import lambda_packet, pi_packet
+    from OpenAEM.eddy_geometry import EddyGeometry
+    params = dict(config['eddy'])
+    packet = params.pop('packet')
+    packets = {'lambda': lambda_packet, 'pi': pi_packet}
+    if packet not in packets:
+        raise ValueError(f'unknown eddy packet: {packet}')
+    return EddyGeometry.from_segments(packets[packet](**params))
+
+def place(config, grid, eddy):
+    """eddies of all hierarchy levels around the box
+
+    Returns:
+        tuple: (positions (2, N), heights (N,))
+    """
+    import numpy as np
+    from OpenAEM.synthesis import influence_reach
+    from OpenAEM.wall_patch import Wall_Patch
+    x, y, _ = grid
+    placement = config['placement']
+    levels = np.asarray(placement['heights'], dtype=float)
+    reach = influence_reach(eddy, config['synthesis']['influence_radius'],
+                            config['synthesis']['image'])
+    if placement['periodic']:
+        dx = x[1] - x[0]; dy = y[1] - y[0]
+        patch = Wall_Patch(x[0] - 0.5*dx, x[-1] + 0.5*dx,
+                           y[0] - 0.5*dy, y[-1] + 0.5*dy)
+    else:
+        margin = reach[:2]*levels.max()
+        patch = Wall_Patch(x[0] - margin[0], x[-1] + margin[0],
+                           y[0] - margin[1], y[-1] + margin[1])
+    positions, heights, _ = patch.place_hierarchies(
+        levels, placement['lam'], seed=config['seed'], radius=placement['radius'])
+    if placement['periodic']:
+        positions, heights, _ = patch.periodic_images(positions, heights, reach[:2])
+    return positions, heights
+
+def run(config, output, restart=False):
+    """synthesize the field tile by tile into output, resuming a killed run
+
+    The tiles are slabs of config['tile'] x planes written by stream_field,
+    whose JSON header is the checkpoint manifest. The placed eddies are
+    saved next to the field (output + '.eddies.npz') so a resumed run uses
+    the same eddies even without a seed.
+
+    Args:
+        config (dict): run description from load_config
+        output (str): .npy file
+        restart (bool, optional): discard a previous run. Defaults to False.
+    """
+    import numpy as np
+    from functools import partial
+    from OpenAEM.field_io import stream_field
+    from OpenAEM.synthesis import synthesize
+
+    manifest = _read_manifest(output)
+    resume = not restart and manifest is not None
+    if resume and manifest['metadata'].get('config') != config:
+        raise ValueError(f'{output} belongs to a different run, '
+                         'use --restart to overwrite it')
+
+    grid = build_grid(config)
+    eddy = build_eddy(config)
+    eddies_path = output + '.eddies.npz'
+    if resume and os.path.exists(eddies_path):
+        with np.load(eddies_path) as data:
+            positions, heights = data['positions'], data['heights']
+    else:
+        positions, heights = place(config, grid, eddy)
+        tmp = eddies_path + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f, positions=positions, heights=heights)
+        os.replace(tmp, eddies_path)
+
+    field = partial(synthesize, eddy=eddy, positions=positions, heights=heights,
+                    **config['synthesis'])
+    stream_field(output, grid, field, axis=0, slab=config['tile'],
+                 metadata={'config': config}, resume=resume)
+
+def status(output):
+    """progress of a run from its checkpoint manifest"""
+    manifest = _read_manifest(output)
+    if manifest is None:
+        return f'{output}: not started'
+    nx = manifest['shape'][1]
+    total = -(-nx // manifest['slab'])
+    return f'{output}: {manifest["completed"]}/{total} tiles'
+
+def _read_manifest(output):
+    """JSON header of stream_field, None before the first tile"""
+    path = output + '.json'
+    if not (os.path.exists(output) and os.path.exists(path)):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def _output_path(config_path, config, output=None):
+    """output file, relative paths are taken from the config directory"""
+    output = output or config['output']
+    return os.path.join(os.path.dirname(os.path.abspath(config_path)), output)
+
+def _parser():
+    parser = argparse.ArgumentParser(
+        prog='openaem',
+        description='Synthetic wall turbulence from the attached eddy model.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='synthesize a field, resuming an '
+                              'interrupted run')
+    run.add_argument('config', help='JSON run description')
+    run.add_argument('-o', '--output', help='.npy output, overrides the config')
+    run.add_argument('--restart', action='store_true',
+                     help='discard a previous run instead of resuming it')
+
+    stat = commands.add_parser('status', help='show the progress of a run')
+    stat.add_argument('config', help='JSON run description')
+    stat.add_argument('-o', '--output', help='.npy output, overrides the config')
+    stat.set_defaults(restart=False)
+
+    commands.add_parser('example', help='print a run description with the '
+                        'default values')
+    return parser
+
+if __name__ == '__main__':
+    sys.exit(main())
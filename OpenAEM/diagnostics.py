@@ -0,0 +1,48 @@
+import numpy as np
+
+def vorticity(grad):
+    """vorticity from the velocity gradient
+
+    Args:
+        grad (ndarray): (3, 3, ...) tensor du_i/dx_k, e.g. from
+            biot_savart_eddy(..., gradient=True)
+
+    Returns:
+        ndarray: (3, ...) vorticity
+
+    Formulas:
+        omega = (dw/dy - dv/dz, du/dz - dw/dx, dv/dx - du/dy)
+    """
+    return np.stack((grad[2, 1] - grad[1, 2],
+                     grad[0, 2] - grad[2, 0],
+                     grad[1, 0] - grad[0, 1]))
+
+def q_criterion(grad):
+    """second invariant of the velocity gradient
+
+    Args:
+        grad (ndarray): (3, 3, ...) tensor du_i/dx_k
+
+    Returns:
+        ndarray: (...) Q, positive where rotation dominates strain
+
+    Formulas:
+        Q = 1/2 (|Omega|^2 - |S|^2) = -1/2 du_i/dx_k du_k/dx_i
+    """
+    return -0.5*np.einsum('ik...,ki...->...', grad, grad)
+
+def dissipation(grad, nu):
+    """dissipation rate of a velocity gradient
+
+    Args:
+        grad (ndarray): (3, 3, ...) tensor du_i/dx_k
+        nu (float): kinematic viscosity
+
+    Returns:
+        ndarray: (...) dissipation
+
+    Formulas:
+        epsilon = 2 nu S_ik S_ik,  S = (grad + grad^T)/2
+    """
+    strain = 0.5*(grad + np.swapaxes(grad, 0, 1))
+    return 2*nu*np.sum(strain*strain, axis=(0, 1))
@@ -0,0 +1,180 @@
+import numpy as np
+
+from OpenAEM.line import DLS
+
+class EddyGeometry:
+    def __init__(self, p0, p1, gamma=None, ds=0.01) -> None:
+        """array-backed eddy made of S directed line segments
+
+        Args:
+            p0 (ndarray): (3, S) starting points
+            p1 (ndarray): (3, S) ending points
+            gamma (ndarray, optional): (S,) circulation relative to a DLS.
+                Defaults to ones.
+            ds (float or ndarray, optional): (S,) target spacing used when
+                the segments are discretized. Defaults to 0.01.
+        """
+        self.p0 = np.array(p0, dtype=float).reshape(3, -1)
+        self.p1 = np.array(p1, dtype=float).reshape(3, -1)
+        nseg = self.p0.shape[1]
+        if gamma is None:
+            gamma = 1.0
+        self.gamma = np.array(np.broadcast_to(gamma, (nseg,)), dtype=float)
+        self.ds = np.array(np.broadcast_to(ds, (nseg,)), dtype=float)
+
+    @staticmethod
+    def from_segments(eddy):
+        """pack a list of segments
+
+        Args:
+            eddy (list[Line]): straight segments, DLS spacing is kept
+
+        Returns:
+            EddyGeometry: packed eddy
+        """
+        if isinstance(eddy, EddyGeometry):
+            return eddy
+        p0 = np.array([line.get_p0() for line in eddy], dtype=float).reshape(-1, 3).T
+        p1 = np.array([line.get_p1() for line in eddy], dtype=float).reshape(-1, 3).T
+        ds = [line.get_ds() if isinstance(line, DLS) else 0.01 for line in eddy]
+        return EddyGeometry(p0, p1, ds=ds)
+
+    def to_segments(self):
+        """unpack into DLS objects
+
+        Returns:
+            list[DLS]: one DLS per segment
+
+        Remarks:
+            a DLS has unit circulation, so a ValueError is raised when gamma
+            is not one, e.g. after place(); slices keep gamma
+        """
+        return [self[i] for i in range(len(self))]
+
+    # vectorized transformations, each returns a new EddyGeometry
+    def translate(self, offset):
+        """shift all segments by offset (3,)"""
+        offset = np.asarray(offset, dtype=float).reshape(3, 1)
+        return EddyGeometry(self.p0 + offset, self.p1 + offset,
+                            gamma=self.gamma, ds=self.ds)
+
+    def scale(self, factor):
+        """scale all segments about the origin
+
+        Remarks:
+            ds is scaled as well so the discretization is geometrically
+            similar; the circulation is unchanged
+        """
+        return EddyGeometry(self.p0*factor, self.p1*factor,
+                            gamma=self.gamma, ds=self.ds*factor)
+
+    def rotate(self, angle, axis='z'):
+        """rotate all segments about a coordinate axis through the origin
+
+        Args:
+            angle (float): angle in degrees (right-hand rule)
+            axis (str, optional): 'x', 'y' or 'z'. Defaults to 'z'.
+        """
+        c = np.cos(np.deg2rad(angle))
+        s = np.sin(np.deg2rad(angle))
+        if axis == 'x':
+            R = np.array([[1, 0, 0], [0, c, -s], [0, s, c]])
+        elif axis == 'y':
+            R = np.array([[c, 0, s], [0, 1, 0], [-s, 0, c]])
+        elif axis == 'z':
+            R = np.array([[c, -s, 0], [s, c, 0], [0, 0, 1]])
+        else:
+            raise ValueError(f'unknown rotation axis: {axis}')
+        return EddyGeometry(R @ self.p0, R @ self.p1,
+                            gamma=self.gamma, ds=self.ds)
+
+    def place(self, positions, heights):
+        """copies of a unit eddy attached to the wall z = 0
+
+        Args:
+            positions (ndarray): (2, N) wall-parallel positions (x, y)
+            heights (float or ndarray): (N,) eddy heights
+
+        Returns:
+            EddyGeometry: N*S segments, copy k scaled by h_k and with h_k
+                times the circulation so that all copies share the velocity
+                scale of the unit eddy
+        """
+        positions = np.asarray(positions, dtype=float).reshape(2, -1)
+        neddies = positions.shape[1]
+        heights = np.broadcast_to(np.asarray(heights, dtype=float), (neddies,))
+        origins = np.vstack((positions, np.zeros(neddies)))[:, :, np.newaxis]
+        h = heights[:, np.newaxis]
+        return EddyGeometry((h*self.p0[:, np.newaxis, :] + origins).reshape(3, -1),
+                            (h*self.p1[:, np.newaxis, :] + origins).reshape(3, -1),
+                            gamma=(h*self.gamma).ravel(),
+                            ds=(h*self.ds).ravel())
+
+    def mirror(self, symmetry_plane='xy'):
+        """mirror all segments, see Line.mirror_point"""
+        axis = {'yz': 0, 'xz': 1, 'xy': 2}[symmetry_plane]
+        p0 = self.p0.copy(); p0[axis] = -p0[axis]
+        p1 = self.p1.copy(); p1[axis] = -p1[axis]
+        return EddyGeometry(p0, p1, gamma=self.gamma, ds=self.ds)
+
+    def reverse(self):
+        """reverse the direction of all segments"""
+        return EddyGeometry(self.p1, self.p0, gamma=self.gamma, ds=self.ds)
+
+    # segment properties
+    def dirs(self):
+        """direction vectors
+
+        Returns:
+            ndarray: (3, S)
+        """
+        return self.p1 - self.p0
+
+    def lengths(self):
+        """segment lengths
+
+        Returns:
+            ndarray: (S,)
+        """
+        return np.linalg.norm(self.p1 - self.p0, axis=0)
+
+    @property
+    def centre(self):
+        """centre of the bounding box
+
+        Returns:
+            ndarray: (3,)
+        """
+        pts = np.hstack((self.p0, self.p1))
+        return 0.5*(pts.min(axis=1) + pts.max(axis=1))
+
+    # list-like behaviour so EddyGeometry can stand in for list[DLS]
+    def __len__(self) -> int:
+        return self.p0.shape[1]
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            if self.gamma[index] != 1.0:
+                raise ValueError(f'segment {index} has circulation '
+                                 f'{self.gamma[index]:g}, a DLS has unit '
+                                 'circulation; slice the EddyGeometry instead')
+            return DLS(self.p0[:, index], self.p1[:, index], ds=self.ds[index])
+        return EddyGeometry(self.p0[:, index], self.p1[:, index],
+                            gamma=self.gamma[index], ds=self.ds[index])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __add__(self, other):
+        other = EddyGeometry.from_segments(other)
+        return EddyGeometry(np.hstack((self.p0, other.p0)),
+                            np.hstack((self.p1, other.p1)),
+                            gamma=np.concatenate((self.gamma, other.gamma)),
+                            ds=np.concatenate((self.ds, other.ds)))
+
+    def __radd__(self, other):
+        return EddyGeometry.from_segments(other) + self
+
+    def __str__(self) -> str:
+        return f'EddyGeometry with {len(self)} segments'
@@ -0,0 +1,168 @@
+import os
+import numpy as np
+
+from OpenAEM.eddy_geometry import EddyGeometry
+from OpenAEM.biot_savart import biot_savart_grid, DEFAULT_MEMORY_BUDGET
+from OpenAEM.synthesis import synthesize
+
+class EddyTemplate:
+    def __init__(self, x, y, z, velocity) -> None:
+        """induced velocity of a unit eddy tabulated on a lookup grid
+
+        Args:
+            x (ndarray): (nx,) increasing grid coordinates
+            y (ndarray): (ny,) increasing grid coordinates
+            z (ndarray): (nz,) increasing grid coordinates
+            velocity (ndarray): (3, nx, ny, nz) induced velocity
+
+        Remarks:
+            the velocity is trilinearly interpolated and vanishes outside
+            the lookup grid
+        """
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.z = np.asarray(z, dtype=float)
+        self.velocity = np.asarray(velocity, dtype=float)
+        from scipy.interpolate import RegularGridInterpolator
+        self.interpolator = RegularGridInterpolator(
+            (self.x, self.y, self.z), np.moveaxis(self.velocity, 0, -1),
+            bounds_error=False, fill_value=0.0)
+
+    @staticmethod
+    def build(eddy, n=64, extent=20.0, core=0.5, r0=0.1,
+              memory_budget=DEFAULT_MEMORY_BUDGET, image=False):
+        """tabulate the induced velocity of a unit eddy
+
+        Args:
+            eddy (EddyGeometry or list[DLS]): unit eddy (height 1)
+            n (int, optional): grid points per direction. Defaults to 64.
+            extent (float, optional): half width of the lookup grid measured
+                from the eddy centre. Defaults to 20.0.
+            core (float, optional): length over which the grid is nearly
+                uniform, see stretched_axis. Defaults to 0.5.
+            r0 (float, optional): cutoff radius. Defaults to 0.1.
+            memory_budget (int, optional): bytes allowed for temporaries.
+                Defaults to DEFAULT_MEMORY_BUDGET.
+            image (bool, optional): tabulate the eddy together with its wall
+                image, see biot_savart_eddy. Defaults to False.
+
+        Returns:
+            EddyTemplate: template of the eddy
+        """
+        eddy = EddyGeometry.from_segments(eddy)
+        x, y, z = (stretched_axis(c, extent, n, core) for c in eddy.centre)
+        velocity = biot_savart_grid((x, y, z), eddy, r0=r0,
+                                    memory_budget=memory_budget, image=image)
+        return EddyTemplate(x, y, z, velocity)
+
+    @staticmethod
+    def cached(path, eddy, **kwargs):
+        """load a template from path or build and save it
+
+        The stored eddy geometry is compared with eddy so a stale file is
+        rebuilt instead of silently reused.
+
+        Args:
+            path (str): .npz file
+            eddy (EddyGeometry or list[DLS]): unit eddy
+            **kwargs: passed to EddyTemplate.build
+
+        Returns:
+            EddyTemplate: template of the eddy
+        """
+        eddy = EddyGeometry.from_segments(eddy)
+        key = _template_key(eddy, kwargs)
+        if os.path.exists(path):
+            with np.load(path) as data:
+                if 'key' in data and np.array_equal(data['key'], key):
+                    return EddyTemplate(data['x'], data['y'], data['z'],
+                                        data['velocity'])
+
+        template = EddyTemplate.build(eddy, **kwargs)
+        template.save(path, key=key)
+        return template
+
+    def save(self, path, key=None):
+        """save the template as .npz"""
+        arrays = dict(x=self.x, y=self.y, z=self.z, velocity=self.velocity)
+        if key is not None:
+            arrays['key'] = key
+        with open(path, 'wb') as f:
+            np.savez(f, **arrays)
+
+    @staticmethod
+    def load(path):
+        """load a template saved by EddyTemplate.save"""
+        with np.load(path) as data:
+            return EddyTemplate(data['x'], data['y'], data['z'],
+                                data['velocity'])
+
+    def __call__(self, xv):
+        """interpolated velocity of the unit eddy
+
+        Args:
+            xv (float ndarray): (3,) or (3, M) location in eddy units
+
+        Returns:
+            float ndarray: (3,) or (3, M) induced velocity
+        """
+        xv = np.asarray(xv, dtype=float)
+        uvv = self.interpolator(xv.reshape(3, -1).T).T
+        return uvv[:, 0] if xv.ndim == 1 else uvv
+
+    def induced_velocity(self, xv, positions, heights,
+                         memory_budget=DEFAULT_MEMORY_BUDGET):
+        """velocity of scaled and translated copies of the unit eddy
+
+        Args:
+            xv (float ndarray): (3, M) location request
+            positions (ndarray): (2, N) wall-parallel eddy positions
+            heights (float or ndarray): (N,) eddy heights
+            memory_budget (int, optional): bytes allowed for temporaries.
+                Defaults to DEFAULT_MEMORY_BUDGET.
+
+        Returns:
+            float ndarray: (3, M) induced velocity
+
+        Formulas:
+            u(x) = sum_k u_1((x - X_k)/h_k), X_k = (x_k, y_k, 0)
+
+        Remarks:
+            see synthesize for culling by domain of influence
+        """
+        return synthesize(xv, self, positions, heights,
+                          memory_budget=memory_budget)
+
+    @property
+    def centre(self):
+        """centre of the lookup grid, i.e. of the unit eddy"""
+        return 0.5*np.array([self.x[0] + self.x[-1], self.y[0] + self.y[-1],
+                             self.z[0] + self.z[-1]])
+
+def stretched_axis(centre, extent, n, core=0.5):
+    """1d grid that is nearly uniform near centre and log-spaced far away
+
+    Args:
+        centre (float): centre of the grid
+        extent (float): half width of the grid
+        n (int): number of points
+        core (float, optional): length scale of the uniform part.
+            Defaults to 0.5.
+
+    Returns:
+        ndarray: (n,) grid points
+
+    Formulas:
+        x = centre + core*sinh(xi), xi uniform in [-asinh(extent/core), asinh(extent/core)]
+        so the spacing grows like the distance from centre when |x - centre| >> core
+    """
+    xi_max = np.arcsinh(extent/core)
+    return centre + core*np.sinh(np.linspace(-xi_max, xi_max, n))
+
+def _template_key(eddy, kwargs):
+    """array identifying an eddy and the build parameters"""
+    params = [kwargs.get('n', 64), kwargs.get('extent', 20.0),
+              kwargs.get('core', 0.5), kwargs.get('r0', 0.1),
+              kwargs.get('image', False)]
+    return np.concatenate((eddy.p0.ravel(), eddy.p1.ravel(), eddy.gamma,
+                           np.asarray(params, dtype=float)))
@@ -0,0 +1,119 @@
+import numpy as np
+
+from OpenAEM.biot_savart import DEFAULT_MEMORY_BUDGET
+from OpenAEM.synthesis import placed_origins, _unit_field
+from OpenAEM.velocity_field import grid_vectors
+
+class FFTSynthesizer:
+    def __init__(self, grid, eddy, r0=0.1,
+                 memory_budget=DEFAULT_MEMORY_BUDGET, image=False) -> None:
+        """field synthesis by FFT convolution on a periodic x-y grid
+
+        All eddies of one hierarchy level are copies of the same footprint,
+        so per level the velocity is the circular convolution of the eddy
+        density with the footprint:
+
+            u(x, y, z) = (rho_h * F_h)(x, y, z),  F_h = u_1((x, y, z)/h)
+
+        The footprint transforms are computed once per height and cached,
+        so a realization costs one FFT pair per level whatever the number
+        of eddies.
+
+        Args:
+            grid (tuple[ndarray]): uniform (X, Y, Z) from get_grid or (x, y, z)
+                vectors, periodic in x and y with period n*dx
+            eddy (EddyGeometry, list[DLS] or EddyTemplate): unit eddy
+            r0 (float, optional): cutoff radius in eddy units. Defaults to 0.1.
+            memory_budget (int, optional): bytes allowed for temporaries of
+                the footprint evaluation. Defaults to DEFAULT_MEMORY_BUDGET.
+            image (bool, optional): add the wall image of every eddy, see
+                synthesize. Defaults to False.
+
+        Remarks:
+            the footprint is truncated to one period around the eddy and the
+            positions are deposited with cloud-in-cell weights
+        """
+        self.x, self.y, self.z = grid_vectors(grid)
+        self.dx = self.x[1] - self.x[0]
+        self.dy = self.y[1] - self.y[0]
+        self.unit_field = _unit_field(eddy, r0, memory_budget, image)
+        self.footprints = {}
+
+    def shape(self):
+        return (3, self.x.size, self.y.size, self.z.size)
+
+    def footprint(self, h):
+        """x-y transform of the velocity of one eddy of height h at the origin
+
+        Returns:
+            complex ndarray: (3, nx, ny//2 + 1, nz)
+        """
+        if h not in self.footprints:
+            nx, ny = self.x.size, self.y.size
+            # offsets wrapped into [-L/2, L/2)
+            ox = ((np.arange(nx) + nx//2) % nx - nx//2)*self.dx
+            oy = ((np.arange(ny) + ny//2) % ny - ny//2)*self.dy
+            OX, OY, Z = np.meshgrid(ox, oy, self.z, indexing='ij')
+            xi = np.vstack((OX.ravel(), OY.ravel(), Z.ravel()))/h
+            F = self.unit_field(xi).reshape(self.shape())
+            self.footprints[h] = np.fft.rfft2(F, axes=(1, 2))
+        return self.footprints[h]
+
+    def deposit(self, positions):
+        """cloud-in-cell eddy count on the x-y grid
+
+        Args:
+            positions (ndarray): (2, N) wall-parallel positions
+
+        Returns:
+            ndarray: (nx, ny) number of eddies per cell
+        """
+        nx, ny = self.x.size, self.y.size
+        fx = (positions[0] - self.x[0])/self.dx
+        fy = (positions[1] - self.y[0])/self.dy
+        i = np.floor(fx).astype(int); wx = fx - i
+        j = np.floor(fy).astype(int); wy = fy - j
+
+        rho = np.zeros(nx*ny)
+        for di, dj, w in [(0, 0, (1 - wx)*(1 - wy)), (1, 0, wx*(1 - wy)),
+                          (0, 1, (1 - wx)*wy), (1, 1, wx*wy)]:
+            index = ((i + di) % nx)*ny + (j + dj) % ny
+            rho += np.bincount(index, weights=w, minlength=nx*ny)
+        return rho.reshape(nx, ny)
+
+    def __call__(self, positions, heights, out=None):
+        """velocity of placed eddies on the grid
+
+        Args:
+            positions (ndarray): (2, N) wall-parallel positions
+            heights (float or ndarray): (N,) eddy heights, each distinct
+                height is one hierarchy level
+            out (float ndarray, optional): preallocated (3, nx, ny, nz)
+                output. Defaults to None.
+
+        Returns:
+            float ndarray: (3, nx, ny, nz) velocity, unpack as U, V, W
+        """
+        origins, heights = placed_origins(positions, heights)
+        if out is None:
+            out = np.zeros(self.shape())
+        else:
+            out[...] = 0.0
+
+        nx, ny = self.x.size, self.y.size
+        for h in np.unique(heights):
+            rho_hat = np.fft.rfft2(self.deposit(origins[:2, heights == h]))
+            out += np.fft.irfft2(self.footprint(h)*rho_hat[:, :, np.newaxis],
+                                 s=(nx, ny), axes=(1, 2))
+        return out
+
+def fft_synthesize(grid, eddy, positions, heights, r0=0.1,
+                   memory_budget=DEFAULT_MEMORY_BUDGET, image=False):
+    """one-off FFTSynthesizer evaluation, see FFTSynthesizer
+
+    Returns:
+        float ndarray: (3, nx, ny, nz) velocity, unpack as U, V, W
+    """
+    synthesizer = FFTSynthesizer(grid, eddy, r0=r0, memory_budget=memory_budget,
+                                 image=image)
+    return synthesizer(positions, heights)
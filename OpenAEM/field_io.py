@@ -0,0 +1,84 @@
+import os
+import json
+import numpy as np
+
+from OpenAEM.velocity_field import grid_vectors, iter_grid_slabs
+
+def stream_field(path, grid, field, axis=0, slab=1, metadata=None,
+                 resume=True):
+    """evaluate a velocity field slab by slab into an on-disk .npy array
+
+    The (3, nx, ny, nz) array is created with np.lib.format.open_memmap, so
+    at most one slab of points and velocities is held in memory. A small
+    JSON header next to the array (path + '.json') stores the grid, the
+    slab layout and the number of finished slabs, and is updated after every
+    slab so that an interrupted run resumes where it stopped.
+
+    Args:
+        path (str): .npy file
+        grid (tuple[ndarray]): (X, Y, Z) from get_grid or (x, y, z) vectors
+        field (callable): map from (3, M) points to (3, M) velocity
+        axis (int, optional): slab direction, 0 for x and 1 for y.
+            Defaults to 0.
+        slab (int, optional): grid planes per slab. Defaults to 1.
+        metadata (dict, optional): extra JSON-serializable entries stored in
+            the header, e.g. the eddies and the seed of the run. Defaults to
+            None.
+        resume (bool, optional): continue an unfinished file with the same
+            grid, slab layout and metadata instead of starting over.
+            Defaults to True.
+
+    Returns:
+        str: path of the header
+    """
+    x, y, z = grid_vectors(grid)
+    shape = (3, x.size, y.size, z.size)
+    header = {'shape': list(shape), 'axis': axis, 'slab': slab,
+              'x': x.tolist(), 'y': y.tolist(), 'z': z.tolist(),
+              'metadata': json.loads(json.dumps(metadata or {})),
+              'completed': 0}
+
+    meta_path = path + '.json'
+    done = 0
+    if resume and os.path.exists(path) and os.path.exists(meta_path):
+        with open(meta_path) as f:
+            previous = json.load(f)
+        if all(previous.get(key) == header[key]
+               for key in ('shape', 'axis', 'slab', 'x', 'y', 'z', 'metadata')):
+            done = previous['completed']
+    header['completed'] = done
+    uvv = np.lib.format.open_memmap(path, mode='r+' if done else 'w+',
+                                    dtype=float, shape=shape)
+
+    slabs = iter_grid_slabs((x, y, z), axis, slab, first=done)
+    for n, (index, (X, Y, Z)) in enumerate(slabs, start=done):
+        xv = np.vstack((X.ravel(), Y.ravel(), Z.ravel()))
+        uvv[(slice(None),) + index] = np.reshape(field(xv), (3,) + X.shape)
+        uvv.flush()
+        header['completed'] = n + 1
+        _write_header(meta_path, header)
+
+    del uvv
+    _write_header(meta_path, header)
+    return meta_path
+
+def open_field(path, mode='r'):
+    """memory-map a field written by stream_field without copying it
+
+    Args:
+        path (str): .npy file
+        mode (str, optional): np.load mmap_mode. Defaults to 'r'.
+
+    Returns:
+        tuple: ((3, nx, ny, nz) memory-mapped velocity, header dict)
+    """
+    with open(path + '.json') as f:
+        header = json.load(f)
+    return np.load(path, mmap_mode=mode), header
+
+def _write_header(meta_path, header):
+    """atomically replace the JSON header"""
+    tmp = meta_path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(header, f)
+    os.replace(tmp, meta_path)
@@ -0,0 +1,140 @@
+import numpy as np
+
+from OpenAEM.biot_savart import DEFAULT_MEMORY_BUDGET
+from OpenAEM.synthesis import synthesize, influence_reach
+from OpenAEM.velocity_field import grid_vectors
+from OpenAEM.wall_patch import Wall_Patch
+
+class FrozenTurbulence:
+    def __init__(self, grid, eddy, heights, lam, convection=1.0,
+                 influence_radius=4.0, r0=0.1, seed=None, image=False,
+                 memory_budget=DEFAULT_MEMORY_BUDGET) -> None:
+        """incremental frozen-turbulence snapshots on a box grid
+
+        The eddies of every hierarchy level are placed on a wall patch that
+        covers the box and its margins, i.e. every eddy whose domain of
+        influence reaches the box. A step convects them by a whole number
+        of grid cells: the old field is shifted, the inlet columns are
+        evaluated from scratch, the eddies placed in the inlet strip are
+        added to the columns they reach and the eddies that left the
+        patch are dropped. Nothing else is recomputed.
+
+        Args:
+            grid (tuple[ndarray]): (X, Y, Z) from get_grid or (x, y, z)
+                vectors, uniform in x
+            eddy (EddyGeometry, list[DLS] or EddyTemplate): unit eddy
+            heights (ndarray): (L,) hierarchy levels, see
+                Wall_Patch.place_hierarchies
+            lam (float): density of eddies of height 1
+            convection (float, optional): streamwise convection speed, > 0.
+                Defaults to 1.0.
+            influence_radius (float, optional): radius of the domain of
+                influence in eddy heights, see synthesize. It must be finite
+                for the eddies outside the patch to be negligible, None is
+                not accepted. Defaults to 4.0.
+            r0 (float, optional): cutoff radius in eddy units. Defaults to 0.1.
+            seed (optional): seed or Generator. Defaults to None.
+            image (bool, optional): add the wall image of every eddy.
+                Defaults to False.
+            memory_budget (int, optional): bytes allowed for temporaries.
+                Defaults to DEFAULT_MEMORY_BUDGET.
+
+        Remarks:
+            the shifted field is exact because every eddy moves by the same
+            distance and dropped eddies are out of reach of the box
+        """
+        if influence_radius is None:
+            raise ValueError('influence_radius must be finite, the shifted '
+                             'field needs eddies of bounded reach')
+        if not convection > 0:
+            raise ValueError(f'convection must be positive, got {convection}')
+        self.x, self.y, self.z = grid_vectors(grid)
+        self.dx = self.x[1] - self.x[0]
+        if not np.allclose(np.diff(self.x), self.dx):
+            raise ValueError('the grid must be uniform in x')
+
+        self.eddy = eddy
+        self.levels = np.asarray(heights, dtype=float).reshape(-1)
+        self.lam = lam
+        self.convection = convection
+        self.kwargs = dict(r0=r0, influence_radius=influence_radius,
+                           image=image, memory_budget=memory_budget)
+        self.rng = np.random.default_rng(seed)
+        self.time = 0.0
+
+        reach = influence_reach(eddy, influence_radius, image)
+        hmax = self.levels.max()
+        self.reach = reach[0]
+        self.patch = Wall_Patch(self.x[0] - reach[0]*hmax, self.x[-1] + reach[0]*hmax,
+                                self.y[0] - reach[1]*hmax, self.y[-1] + reach[1]*hmax)
+        self.positions, self.heights, _ = self.patch.place_hierarchies(
+            self.levels, lam, seed=self.rng)
+        self.field = self._evaluate(slice(None), self.positions, self.heights)
+
+    def shape(self):
+        return (3, self.x.size, self.y.size, self.z.size)
+
+    def step(self, shift=1):
+        """convect the eddies by shift cells
+
+        Args:
+            shift (int, optional): cells per step, 0 leaves the field
+                unchanged. Defaults to 1.
+
+        Returns:
+            float ndarray: (3, nx, ny, nz) field after the step
+        """
+        if shift < 0:
+            raise ValueError(f'shift must not be negative, got {shift}')
+        if shift == 0:
+            return self.field
+        distance = shift*self.dx
+        self.time += distance/self.convection
+
+        inlet = Wall_Patch(self.patch.xmin - distance, self.patch.xmin,
+                           self.patch.zmin, self.patch.zmax)
+        new, new_heights, _ = inlet.place_hierarchies(self.levels, self.lam,
+                                                      seed=self.rng)
+        new[0] += distance
+        self.positions[0] += distance
+        keep = self.positions[0] < self.patch.xmax
+        self.positions = np.hstack((self.positions[:, keep], new))
+        self.heights = np.concatenate((self.heights[keep], new_heights))
+
+        nx = self.x.size
+        if shift >= nx:
+            self.field = self._evaluate(slice(None), self.positions, self.heights)
+            return self.field
+
+        self.field[:, shift:] = self.field[:, :-shift]
+        # the new eddies reach the columns up to the inlet edge plus their reach
+        reach = self.patch.xmin + distance + self.reach*new_heights.max(initial=0.0)
+        stop = min(int(np.searchsorted(self.x, reach, side='right')), nx)
+        if stop > shift and new_heights.size > 0:
+            self.field[:, shift:stop] += self._evaluate(slice(shift, stop), new,
+                                                        new_heights)
+        self.field[:, :shift] = self._evaluate(slice(0, shift), self.positions,
+                                               self.heights)
+        return self.field
+
+    def frames(self, nsteps, shift=1, plane=0):
+        """inflow planes of successive steps
+
+        Args:
+            nsteps (int): number of steps
+            shift (int, optional): cells per step. Defaults to 1.
+            plane (int, optional): x index of the inflow plane. Defaults to 0.
+
+        Yields:
+            tuple: (time, (3, ny, nz) velocity on the plane)
+        """
+        for _ in range(nsteps):
+            self.step(shift)
+            yield self.time, self.field[:, plane].copy()
+
+    def _evaluate(self, columns, positions, heights):
+        """synthesize on the x columns of the grid"""
+        X, Y, Z = np.meshgrid(self.x[columns], self.y, self.z, indexing='ij')
+        xv = np.vstack((X.ravel(), Y.ravel(), Z.ravel()))
+        uvv = synthesize(xv, self.eddy, positions, heights, **self.kwargs)
+        return uvv.reshape((3,) + X.shape)
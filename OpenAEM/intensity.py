@@ -0,0 +1,127 @@
+import os
+import hashlib
+import numpy as np
+from functools import partial
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from OpenAEM.eddy_geometry import EddyGeometry
+from OpenAEM.biot_savart import biot_savart_eddy, DEFAULT_MEMORY_BUDGET
+
+# components of the intensity functions, (i, j) of I_ij
+INTENSITY_COMPONENTS = {'I11': (0, 0), 'I22': (1, 1), 'I33': (2, 2), 'I13': (0, 2)}
+
+# results of intensity_function in this session, least recently used first
+_cache = OrderedDict()
+# largest number of results kept in _cache
+CACHE_SIZE = 32
+
+def intensity_function(eddy, x=None, y=None, z=None, r0=0.1, workers=1,
+                       slab=8, cache_dir=None,
+                       memory_budget=DEFAULT_MEMORY_BUDGET, image=False):
+    """eddy intensity functions of a single eddy
+
+    The x-y plane averages are accumulated slab by slab while the velocity
+    is evaluated, so the 3D field is never stored.
+
+    Args:
+        eddy (EddyGeometry or list[DLS]): eddy geometry, without its image
+            when image is set
+        x (ndarray, optional): (nx,) streamwise points. Defaults to
+            np.linspace(-5, 5, 501).
+        y (ndarray, optional): (ny,) spanwise points. Defaults to
+            np.linspace(-5, 5, 501).
+        z (ndarray, optional): (nz,) wall-normal points z/h. Defaults to
+            np.linspace(0, 1, 51).
+        r0 (float, optional): cutoff radius. Defaults to 0.1.
+        workers (int, optional): number of processes. Defaults to 1.
+        slab (int, optional): x planes per slab. Defaults to 8.
+        cache_dir (str, optional): directory for .npz results keyed by the
+            eddy geometry and the parameters. Defaults to None (session
+            cache only).
+        memory_budget (int, optional): bytes allowed for temporaries.
+            Defaults to DEFAULT_MEMORY_BUDGET.
+        image (bool, optional): add the wall image of the eddy, the same as
+            passing eddy + mirror_eddy(eddy) at lower cost. Defaults to False.
+
+    Returns:
+        dict: 'z' and the profiles 'I11', 'I22', 'I33', 'I13', each (nz,),
+            copies of the cached arrays
+
+    Formulas:
+        I_ij(z) = < u_i u_j >_xy
+    """
+    eddy = EddyGeometry.from_segments(eddy)
+    x = np.linspace(-5, 5, 501) if x is None else np.asarray(x, dtype=float)
+    y = np.linspace(-5, 5, 501) if y is None else np.asarray(y, dtype=float)
+    z = np.linspace( 0, 1, 51) if z is None else np.asarray(z, dtype=float)
+
+    key = _cache_key(eddy, x, y, z, r0, image)
+    path = None if cache_dir is None else os.path.join(cache_dir, f'intensity_{key}.npz')
+    if key in _cache:
+        _cache.move_to_end(key)
+    elif path is not None and os.path.exists(path):
+        with np.load(path) as data:
+            _store(key, {name: data[name] for name in data.files})
+    else:
+        _store(key, _intensity(eddy, x, y, z, r0, workers, slab,
+                               memory_budget, image))
+
+    result = _cache[key]
+    if path is not None and not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(path, 'wb') as f:
+            np.savez(f, **result)
+    return {name: array.copy() for name, array in result.items()}
+
+def clear_cache():
+    """drop the results of intensity_function kept in this session"""
+    _cache.clear()
+
+def _store(key, result):
+    """add a read-only result to the session cache, evicting the least
+    recently used ones beyond CACHE_SIZE"""
+    for array in result.values():
+        array.setflags(write=False)
+    _cache[key] = result
+    while len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+
+def _intensity(eddy, x, y, z, r0, workers, slab, memory_budget, image):
+    """uncached intensity_function"""
+    field = partial(biot_savart_eddy, eddy=eddy, r0=r0,
+                    memory_budget=memory_budget, image=image)
+    tasks = [((x[start:start + slab], y, z), field)
+             for start in range(0, x.size, slab)]
+    if workers == 1:
+        sums = sum(map(_slab_sums, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # summed in slab order so the result does not depend on workers
+            sums = sum(executor.map(_slab_sums, tasks))
+
+    result = {'z': z}
+    for name, s in zip(INTENSITY_COMPONENTS, sums):
+        result[name] = s/(x.size*y.size)
+    return result
+
+def _slab_sums(task):
+    """x-y sums of u_i u_j over one slab
+
+    Returns:
+        ndarray: (4, nz) in the order of INTENSITY_COMPONENTS
+    """
+    (x, y, z), field = task
+    X, Y, Z = np.meshgrid(x, y, z, indexing='ij')
+    xv = np.vstack((X.ravel(), Y.ravel(), Z.ravel()))
+    uvv = np.reshape(field(xv), (3,) + X.shape)
+    return np.array([np.sum(uvv[i]*uvv[j], axis=(0, 1))
+                     for i, j in INTENSITY_COMPONENTS.values()])
+
+def _cache_key(eddy, x, y, z, r0, image=False):
+    """hash of the eddy geometry and the parameters"""
+    digest = hashlib.sha1()
+    sizes = np.array([len(eddy), x.size, y.size, z.size, r0, image])
+    for array in (sizes, eddy.p0, eddy.p1, eddy.gamma, x, y, z):
+        digest.update(np.ascontiguousarray(array, dtype=float).tobytes())
+    return digest.hexdigest()
@@ -0,0 +1,158 @@
+import numpy as np
+from functools import partial
+from collections import OrderedDict
+
+from OpenAEM.biot_savart import biot_savart_eddy, DEFAULT_MEMORY_BUDGET
+from OpenAEM.synthesis import synthesize
+from OpenAEM.velocity_field import grid_vectors
+
+class VelocityField:
+    def __init__(self, grid, field, tile=(16, 16, 16), max_bytes=2**28) -> None:
+        """velocity on a grid evaluated on demand, tile by tile
+
+        Nothing is computed until the field is indexed. An index is mapped to
+        the tiles it touches, the missing tiles are evaluated and kept in a
+        least recently used cache of at most max_bytes, and the requested
+        points are gathered from the tiles. Looking at one plane of a large
+        grid costs one layer of tiles.
+
+        Args:
+            grid (tuple[ndarray]): (X, Y, Z) from get_grid or (x, y, z)
+                vectors, e.g. from get_stretched_grid
+            field (callable): map from (3, M) points to (3, M) velocity, see
+                VelocityField.from_eddies
+            tile (tuple[int], optional): grid points per tile in x, y and z.
+                Defaults to (16, 16, 16).
+            max_bytes (int, optional): memory cap of the tile cache, the
+                tiles of the current index are kept even beyond it.
+                Defaults to 2**28.
+
+        Remarks:
+            the indices are numpy basic indices on the (3, nx, ny, nz) array:
+            integers, slices and the ellipsis. Integer arrays are applied
+            axis by axis (outer indexing) instead of being broadcast together
+        """
+        self.x, self.y, self.z = grid_vectors(grid)
+        self.field = field
+        self.tile = tuple(int(t) for t in np.broadcast_to(tile, (3,)))
+        self.max_bytes = max_bytes
+        self.tiles = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0; self.misses = 0
+
+    @staticmethod
+    def from_eddies(grid, eddy, positions=None, heights=None, r0=0.1,
+                    influence_radius=None, image=False,
+                    memory_budget=DEFAULT_MEMORY_BUDGET, **kwargs):
+        """lazy field of a single eddy or of placed copies of a unit eddy
+
+        Args:
+            grid (tuple[ndarray]): (X, Y, Z) from get_grid or (x, y, z) vectors
+            eddy (EddyGeometry, list[DLS] or EddyTemplate): the eddy, or the
+                unit eddy when positions are given
+            positions (ndarray, optional): (2, N) wall-parallel eddy
+                positions, see synthesize. Defaults to None (eddy itself).
+            heights (float or ndarray, optional): (N,) eddy heights.
+                Defaults to None.
+            r0 (float, optional): cutoff radius. Defaults to 0.1.
+            influence_radius (float, optional): see synthesize. Defaults to
+                None.
+            image (bool, optional): add the wall image. Defaults to False.
+            memory_budget (int, optional): bytes allowed for temporaries.
+                Defaults to DEFAULT_MEMORY_BUDGET.
+            **kwargs: tile and max_bytes, see VelocityField
+
+        Returns:
+            VelocityField: the lazy field
+        """
+        if positions is None:
+            field = partial(biot_savart_eddy, eddy=eddy, r0=r0, image=image,
+                            memory_budget=memory_budget)
+        else:
+            field = partial(synthesize, eddy=eddy, positions=positions,
+                            heights=heights, r0=r0,
+                            influence_radius=influence_radius, image=image,
+                            memory_budget=memory_budget)
+        return VelocityField(grid, field, **kwargs)
+
+    def shape(self):
+        return (3, self.x.size, self.y.size, self.z.size)
+
+    def __len__(self):
+        return 3
+
+    def __getitem__(self, key):
+        """evaluate the tiles touched by key and gather the points
+
+        Returns:
+            float ndarray: the indexed velocity, e.g. field[0, :, ny//2, :]
+                is the (nx, nz) streamwise velocity on the centre plane
+        """
+        component, index = self._normalize(key)
+        points = [np.atleast_1d(i) for i in index]
+        out = np.empty((3,) + tuple(p.size for p in points))
+
+        owners = [p//t for p, t in zip(points, self.tile)]
+        needed = [np.unique(o) for o in owners]
+        pinned = set()
+        for ti in needed[0]:
+            for tj in needed[1]:
+                for tk in needed[2]:
+                    block = (int(ti), int(tj), int(tk))
+                    pinned.add(block)
+                    values = self._get_tile(block, pinned)
+                    select = [np.nonzero(o == b)[0] for o, b in zip(owners, block)]
+                    local = [p[s] - b*t for p, s, b, t in
+                             zip(points, select, block, self.tile)]
+                    out[np.ix_(range(3), *select)] = values[np.ix_(range(3), *local)]
+
+        drop = tuple(n + 1 for n, i in enumerate(index) if np.ndim(i) == 0)
+        return np.squeeze(out, axis=drop)[component]
+
+    def __array__(self, dtype=None, copy=None):
+        uvv = self[...]
+        return uvv if dtype is None else uvv.astype(dtype)
+
+    def clear(self):
+        """empty the tile cache"""
+        self.tiles.clear()
+        self.nbytes = 0
+
+    # private methods
+    def _normalize(self, key):
+        """component index and one index array or integer per grid axis"""
+        key = key if isinstance(key, tuple) else (key,)
+        if any(k is Ellipsis for k in key):
+            n = key.index(Ellipsis)
+            key = key[:n] + (slice(None),)*(5 - len(key)) + key[n + 1:]
+        key = key + (slice(None),)*(4 - len(key))
+        if len(key) != 4:
+            raise IndexError(f'too many indices for a field of shape {self.shape()}')
+        index = tuple(np.arange(n)[k] for n, k in zip(self.shape()[1:], key[1:]))
+        return key[0], index
+
+    def _get_tile(self, block, pinned):
+        """velocity on a tile, from the cache or evaluated"""
+        if block in self.tiles:
+            self.hits += 1
+            self.tiles.move_to_end(block)
+            return self.tiles[block]
+        self.misses += 1
+        local = [c[b*t:(b + 1)*t] for c, b, t in
+                 zip((self.x, self.y, self.z), block, self.tile)]
+        X, Y, Z = np.meshgrid(*local, indexing='ij')
+        xv = np.vstack((X.ravel(), Y.ravel(), Z.ravel()))
+        values = np.reshape(self.field(xv), (3,) + X.shape)
+
+        self.tiles[block] = values
+        self.nbytes += values.nbytes
+        for old in list(self.tiles):
+            if self.nbytes <= self.max_bytes:
+                break
+            if old not in pinned:
+                self.nbytes -= self.tiles.pop(old).nbytes
+        return values
+
+    def __str__(self) -> str:
+        return (f'VelocityField: {self.shape()}, {len(self.tiles)} tiles cached '
+                f'({self.nbytes} bytes)')
@@ -1,18 +1,42 @@
 import numpy as np
 
 class Line:
+    __slots__ = ('p0', 'p1', 'dir', 'length')
+
     def __init__(self, p0, p1) -> None:
         """analytical line by two points
 
+        Lines are immutable: the points are stored as read-only float copies
+        and attributes cannot be reassigned.
+
         Args:
             p0 (ndarray): (3,)
             p1 (ndarray): (3,)
         """        
-        self.p0 = p0
-        self.p1 = p1
-        self.dir = p1 - p0
-        
-    
+        p0 = _readonly(np.array(p0, dtype=float))
+        p1 = _readonly(np.array(p1, dtype=float))
+        object.__setattr__(self, 'p0', p0)
+        object.__setattr__(self, 'p1', p1)
+        object.__setattr__(self, 'dir', _readonly(p1 - p0))
+        object.__setattr__(self, 'length', np.linalg.norm(self.dir))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    # pickle and copy restore the slots through object.__setattr__
+    def __getstate__(self):
+        return {name: getattr(self, name) for cls in type(self).__mro__
+                for name in getattr(cls, '__slots__', ())}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            if isinstance(value, np.ndarray):
+                value = _readonly(value)
+            object.__setattr__(self, name, value)
+
     def distance2pt(self, p):
         """distance from a point p to current line
                 
@@ -29,13 +53,29 @@ class Line:
         see: https://mathworld.wolfram.com/Point-LineDistance3-Dimensional.html
         """        
         cross_product = np.cross(p - self.p0, p - self.p1)
-        distance = np.linalg.norm(cross_product)/np.linalg.norm(self.dir)
+        distance = np.linalg.norm(cross_product)/self.length
         return distance
     
     def distance2pts(self, p):
         cross_product = np.cross(p - self.p0[:, np.newaxis], p - self.p1[:, np.newaxis], axis=0)
-        return np.linalg.norm(cross_product, axis=0)/np.linalg.norm(self.dir)
+        return np.linalg.norm(cross_product, axis=0)/self.length
     
+    def position(self, t):
+        """point(s) on the line
+
+        Args:
+            t (float or ndarray): parameter, p0 at t = 0 and p1 at t = 1
+
+        Returns:
+            ndarray: (3,) or (3, n)
+        """
+        t = np.asarray(t, dtype=float)
+        return np.multiply.outer(self.p0, 1 - t) + np.multiply.outer(self.p1, t)
+
+    def tangent(self, t):
+        """derivative dx/dt, the direction vector at every t"""
+        return np.multiply.outer(self.dir, np.ones_like(t, dtype=float))
+
     @staticmethod
     def intersect(line_1, line_2):
         """intersection of two lines
@@ -98,9 +138,14 @@ class Line:
         return self.dir
 
 class DLS(Line):
+    __slots__ = ('n', 'ds', 't', '_points', '_dirs', '_weights')
+
     def __init__(self, p0, p1, ds=0.01) -> None:
         """discretized directed line segment (DLS)
 
+        The sample points, direction vectors and quadrature weights are
+        computed on first use and returned as read-only arrays afterwards.
+
         Args:
             p0 (ndarray): starting point
             p1 (ndarray): ending point
@@ -112,35 +157,45 @@ class DLS(Line):
         super().__init__(p0, p1)
         
         # discretize DSL
-        self.length = np.linalg.norm(self.p1 - self.p0)
-        self.n = int(np.ceil(self.length / ds))
-        self.ds = self.length / self.n # actual spacing
-        self.t = 1/self.n*0.5 + np.arange(self.n)/self.n
+        n = int(np.ceil(self.length / ds))
+        object.__setattr__(self, 'n', n)
+        object.__setattr__(self, 'ds', self.length / n) # actual spacing
+        object.__setattr__(self, 't', _readonly(1/n*0.5 + np.arange(n)/n))
+        for name in ('_points', '_dirs', '_weights'):
+            object.__setattr__(self, name, None)
         
     # public methods
     def points(self):
         """sample points along the line (division center)
 
         Returns:
-            float ndarray: (3, n) array and each column is a point
+            float ndarray: (3, n) read-only array and each column is a point
         """
-        x = (1 - self.t)*self.p0[0] + self.t*self.p1[0]
-        y = (1 - self.t)*self.p0[1] + self.t*self.p1[1]
-        z = (1 - self.t)*self.p0[2] + self.t*self.p1[2]
-        
-        return np.vstack((x, y, z))
+        if self._points is None:
+            object.__setattr__(self, '_points', _readonly(self.position(self.t)))
+        return self._points
         
     
     def dirs(self):
         """direction vectors at each division center
 
         Returns:
-            ndarray: (3, n)
+            ndarray: (3, n) read-only
         """        
-        xdirs = np.ones(self.n)*self.get_dir()[0]
-        ydirs = np.ones(self.n)*self.get_dir()[1]
-        zdirs = np.ones(self.n)*self.get_dir()[2]
-        return np.vstack((xdirs, ydirs, zdirs))
+        if self._dirs is None:
+            dirs = np.broadcast_to(self.dir[:, np.newaxis], (3, self.n))
+            object.__setattr__(self, '_dirs', dirs) # broadcast views are read-only
+        return self._dirs
+
+    def weights(self):
+        """Simpson weights over t, identical to scipy.integrate.simpson
+
+        Returns:
+            ndarray: (n,) read-only, integral = f @ weights
+        """
+        if self._weights is None:
+            object.__setattr__(self, '_weights', _readonly(_simpson_weights(self.n, 1/self.n)))
+        return self._weights
     
     def reverse(self):
         """reverse current DLS
@@ -188,5 +243,28 @@ class DLS(Line):
         """        
         return self.length
     
+def _readonly(array):
+    array.flags.writeable = False
+    return array
+
+def _simpson_weights(n, h):
+    """weights of scipy.integrate.simpson on n equally spaced samples
+
+    An even number of samples uses Simpson's rule up to the second last
+    sample and the correction of Cartwright on the last interval.
+    """
+    w = np.zeros(n)
+    if n == 1:
+        return w
+    if n == 2:
+        w[:] = 0.5*h
+        return w
+    m = n if n % 2 == 1 else n - 1
+    w[:m:2] = 2*h/3; w[1:m:2] = 4*h/3
+    w[0] = w[m - 1] = h/3
+    if n % 2 == 0:
+        w[-3:] += np.array([-h/12, 2*h/3, 5*h/12])
+    return w
+
 if __name__ == '__main__':
     pass
\ No newline at end of file
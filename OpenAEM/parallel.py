@@ -0,0 +1,104 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from OpenAEM.velocity_field import grid_vectors
+
+def parallel_field(grid, field, workers=None, slab=None, out=None):
+    """evaluate a velocity field on a grid with a pool of processes
+
+    The grid is split into slabs along x and every slab is evaluated by one
+    worker, which writes it straight into a shared output array. Each point
+    is computed by exactly one call of field, so the result does not depend
+    on the number of workers or on the slab size.
+
+    Args:
+        grid (tuple[ndarray]): (X, Y, Z) from get_grid or (x, y, z) vectors
+        field (callable): picklable map from (3, M) points to (3, M)
+            velocity, e.g. functools.partial(biot_savart_eddy, eddy=eddy)
+            or functools.partial(synthesize, eddy=eddy, positions=positions,
+            heights=heights)
+        workers (int, optional): number of processes. Defaults to
+            os.cpu_count().
+        slab (int, optional): x planes per task. Defaults to about four
+            tasks per worker.
+        out (ndarray, optional): (3, nx, ny, nz) output. A np.memmap (e.g.
+            from np.lib.format.open_memmap) is written in place by the
+            workers, any other array receives a copy. Defaults to None.
+
+    Returns:
+        float ndarray: (3, nx, ny, nz) velocity, unpack as U, V, W
+    """
+    x, y, z = grid_vectors(grid)
+    shape = (3, x.size, y.size, z.size)
+    workers = workers or os.cpu_count()
+    slab = slab or max(-(-x.size // (4*workers)), 1)
+    slabs = [(start, min(start + slab, x.size)) for start in range(0, x.size, slab)]
+
+    if np.prod(shape) == 0:
+        # nothing to evaluate, and shared memory cannot have size 0
+        if out is None:
+            out = np.empty(shape)
+        return out
+
+    if workers == 1:
+        if out is None:
+            out = np.empty(shape)
+        for start, stop in slabs:
+            _evaluate_slab(out, (x, y, z), field, start, stop)
+        return out
+
+    if isinstance(out, np.memmap):
+        target = ('memmap', out.filename, out.offset, out.dtype.str, shape)
+        _run(target, (x, y, z), field, workers, slabs)
+        out.flush()
+        return out
+
+    shm = shared_memory.SharedMemory(create=True, size=8*int(np.prod(shape)))
+    try:
+        _run(('shm', shm.name, shape), (x, y, z), field, workers, slabs)
+        result = np.ndarray(shape, buffer=shm.buf)
+        if out is None:
+            out = result.copy()
+        else:
+            out[...] = result
+        del result
+    finally:
+        shm.close()
+        shm.unlink()
+    return out
+
+def _run(target, vectors, field, workers, slabs):
+    with ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                             initargs=(target, vectors, field)) as executor:
+        # consume the iterator so that worker exceptions are raised here
+        list(executor.map(_evaluate_task, slabs))
+
+# per-process state set by _attach
+_worker = {}
+
+def _attach(target, vectors, field):
+    """open the shared output array in a worker"""
+    if target[0] == 'shm':
+        _, name, shape = target
+        _worker['shm'] = shared_memory.SharedMemory(name=name)
+        out = np.ndarray(shape, buffer=_worker['shm'].buf)
+    else:
+        _, filename, offset, dtype, shape = target
+        out = np.memmap(filename, dtype=dtype, mode='r+', offset=offset,
+                        shape=shape)
+    _worker.update(out=out, vectors=vectors, field=field)
+
+def _evaluate_task(bounds):
+    _evaluate_slab(_worker['out'], _worker['vectors'], _worker['field'], *bounds)
+    if isinstance(_worker['out'], np.memmap):
+        _worker['out'].flush()
+    return bounds
+
+def _evaluate_slab(out, vectors, field, start, stop):
+    """evaluate the x planes start:stop into out"""
+    x, y, z = vectors
+    X, Y, Z = np.meshgrid(x[start:stop], y, z, indexing='ij')
+    xv = np.vstack((X.ravel(), Y.ravel(), Z.ravel()))
+    out[:, start:stop] = np.reshape(field(xv), (3,) + X.shape)
@@ -0,0 +1,108 @@
+import itertools
+import numpy as np
+
+from OpenAEM.biot_savart import DEFAULT_MEMORY_BUDGET
+from OpenAEM.synthesis import (placed_origins, _unit_field, _eddy_centre,
+                               _all_pairs, _PAIR_BYTES, _QUERY_BATCH)
+
+def probe_series(probes, eddy, positions, heights, times, convection=0.0,
+                 r0=0.1, influence_radius=None, image=False,
+                 memory_budget=DEFAULT_MEMORY_BUDGET):
+    """velocity time series at fixed probes while placed eddies convect
+
+    Few points and many eddies: the KD-tree is built over the eddy centres
+    once and queried by the probes, instead of over the points as in
+    synthesize. Under Taylor's hypothesis an eddy convected with speed c is
+    the same as a probe moving with -c, so every (probe, time) pair is a
+    point in the frame of the eddies at t = 0.
+
+    Args:
+        probes (ndarray): (3, P) probe locations
+        eddy (EddyGeometry, list[DLS] or EddyTemplate): unit eddy
+        positions (ndarray): (2, N) wall-parallel eddy positions at t = 0,
+            e.g. from Wall_Patch.place_eddies
+        heights (float or ndarray): (N,) eddy heights
+        times (ndarray): (T,) sample times
+        convection (float or ndarray, optional): streamwise convection
+            speed, scalar or (N,), e.g. one speed per hierarchy level.
+            Defaults to 0.0.
+        r0 (float, optional): cutoff radius in eddy units. Defaults to 0.1.
+        influence_radius (float, optional): radius of the domain of
+            influence in eddy heights, see synthesize. Defaults to None (no
+            culling).
+        image (bool, optional): add the wall image of every eddy, see
+            synthesize. Defaults to False.
+        memory_budget (int, optional): bytes allowed for temporaries.
+            Defaults to DEFAULT_MEMORY_BUDGET.
+
+    Returns:
+        float ndarray: (P, 3, T) velocity at every probe and time
+
+    Formulas:
+        u(p, t) = sum_k u_1((p - X_k - c_k t e_x)/h_k)
+
+    Remarks:
+        eddies are grouped by convection speed, so a few distinct speeds are
+        much cheaper than one per eddy
+    """
+    probes = np.asarray(probes, dtype=float).reshape(3, -1)
+    times  = np.asarray(times, dtype=float).reshape(-1)
+    nprobes, ntimes = probes.shape[1], times.size
+    origins, heights = placed_origins(positions, heights)
+    convection = np.broadcast_to(np.asarray(convection, dtype=float),
+                                 heights.shape)
+
+    unit_field = _unit_field(eddy, r0, memory_budget, image)
+    centre = _eddy_centre(eddy)
+    if image and not callable(eddy):
+        centre = centre*np.array([1.0, 1.0, 0.0])
+
+    uvv = np.zeros((3, nprobes*ntimes))
+    for c in np.unique(convection):
+        group = np.nonzero(convection == c)[0]
+        # (probe, time) points in the frame of the eddies, time major
+        xv = np.tile(probes, ntimes)
+        xv[0] -= c*np.repeat(times, nprobes)
+
+        if influence_radius is None:
+            pairs = _all_pairs(xv.shape[1], group.size, memory_budget)
+        else:
+            centres = origins[:, group] + centre[:, np.newaxis]*heights[group]
+            pairs = _probe_pairs(xv, centres, influence_radius*heights[group],
+                                 memory_budget)
+
+        for points, eddies in pairs:
+            eddies = group[eddies]
+            xi = (xv[:, points] - origins[:, eddies])/heights[eddies]
+            np.add.at(uvv, (slice(None), points), unit_field(xi))
+
+    return np.moveaxis(uvv.reshape(3, ntimes, nprobes), (0, 1), (1, 2))
+
+def _probe_pairs(xv, centres, radii, memory_budget):
+    """(point, eddy) pairs within the domain of influence in chunks
+
+    The eddies are bucketed by octaves of their radius, every bucket has
+    its own KD-tree queried by all points with the largest radius of the
+    bucket, and the pairs are then filtered with the radius of each eddy.
+    """
+    from scipy.spatial import cKDTree
+    size = max(int(memory_budget // _PAIR_BYTES), 1)
+    # zero radii only reach points on the eddy centre, bucket them with the
+    # smallest positive radii instead of taking log2(0)
+    octave = np.floor(np.log2(np.maximum(radii, np.finfo(float).tiny))).astype(int)
+    for level in np.unique(octave):
+        bucket = np.nonzero(octave == level)[0]
+        tree = cKDTree(centres[:, bucket].T)
+        for start in range(0, xv.shape[1], _QUERY_BATCH):
+            stop = min(start + _QUERY_BATCH, xv.shape[1])
+            neighbours = tree.query_ball_point(xv[:, start:stop].T,
+                                               r=radii[bucket].max())
+            counts = np.array([len(n) for n in neighbours], dtype=np.intp)
+            eddies = bucket[np.fromiter(itertools.chain.from_iterable(neighbours),
+                                        dtype=np.intp, count=counts.sum())]
+            points = np.repeat(np.arange(start, stop), counts)
+            near = (np.linalg.norm(xv[:, points] - centres[:, eddies], axis=0)
+                    <= radii[eddies])
+            points = points[near]; eddies = eddies[near]
+            for first in range(0, points.size, size):
+                yield points[first:first + size], eddies[first:first + size]
@@ -0,0 +1,165 @@
+import numpy as np
+
+from OpenAEM.line import Line
+
+class Spline:
+    def __init__(self, points, closed=False, ds=0.05, dtheta=0.05) -> None:
+        """cubic spline vortex filament through a set of points
+
+        The curve is parameterized by the normalized chord length t in
+        [0, 1]. It implements the curve API of DLS (points, dirs, get_t,
+        distance2pt), so it can be used by biot_savart and in eddy lists next
+        to straight segments.
+
+        The quadrature nodes follow the local curvature: the arc length
+        between two nodes is at most ds and the tangent turns by at most
+        dtheta, so straight parts get few nodes and tight heads get many.
+        They are computed on first use and cached.
+
+        Args:
+            points (ndarray): (3, K) points on the curve, K >= 2
+            closed (bool, optional): periodic curve, the first point is
+                appended at the end. Defaults to False.
+            ds (float, optional): largest node spacing. Defaults to 0.05.
+            dtheta (float, optional): largest tangent turn between two
+                nodes in radians. Defaults to 0.05.
+
+        Formulas:
+            n(s) = max(1/ds, kappa(s)/dtheta) nodes per unit length
+        """
+        points = np.asarray(points, dtype=float)
+        if closed:
+            points = np.hstack((points, points[:, :1]))
+        self.control = points
+        self.closed = closed
+        self.ds = ds
+        self.dtheta = dtheta
+
+        chord = np.linalg.norm(np.diff(points, axis=1), axis=0)
+        knots = np.concatenate(([0.0], np.cumsum(chord)))/np.sum(chord)
+        self.knots = knots
+        if closed:
+            bc_type = 'periodic'
+        else:
+            bc_type = 'not-a-knot' if points.shape[1] > 3 else 'natural'
+        from scipy.interpolate import CubicSpline
+        self.spline = CubicSpline(knots, points, axis=1, bc_type=bc_type)
+
+        # cached samples, see get_t
+        self._t = None; self._points = None; self._dirs = None
+
+    # curve API
+    def position(self, t):
+        """point(s) on the curve
+
+        Args:
+            t (float or ndarray): parameter in [0, 1]
+
+        Returns:
+            ndarray: (3,) or (3, n)
+        """
+        return self.spline(t)
+
+    def tangent(self, t):
+        """derivative dx/dt, not normalized"""
+        return self.spline(t, 1)
+
+    def curvature(self, t):
+        """curvature |x' X x''|/|x'|^3"""
+        d1 = self.spline(t, 1); d2 = self.spline(t, 2)
+        return (np.linalg.norm(np.cross(d1, d2, axis=0), axis=0)
+                /np.linalg.norm(d1, axis=0)**3)
+
+    def get_t(self):
+        """curvature-adaptive quadrature nodes, endpoints included
+
+        Returns:
+            ndarray: (n,) odd number of increasing parameters
+        """
+        if self._t is None:
+            self._t = self._discretize()
+        return self._t
+
+    def get_n(self):
+        return self.get_t().size
+
+    def points(self):
+        """sample points at the quadrature nodes
+
+        Returns:
+            float ndarray: (3, n)
+        """
+        if self._points is None:
+            self._points = self.position(self.get_t())
+        return self._points
+
+    def dirs(self):
+        """dx/dt at the quadrature nodes
+
+        Returns:
+            ndarray: (3, n)
+        """
+        if self._dirs is None:
+            self._dirs = self.tangent(self.get_t())
+        return self._dirs
+
+    def get_length(self):
+        """arc length of the curve"""
+        return self._arc_length(self._reference())[-1]
+
+    def distance2pt(self, p):
+        """distance from a point p to the curve"""
+        return self.distance2pts(np.asarray(p, dtype=float).reshape(3, 1))[0]
+
+    def distance2pts(self, p):
+        """distance from points to the polyline through the nodes
+
+        Args:
+            p (ndarray): (3, M) points
+
+        Returns:
+            ndarray: (M,)
+        """
+        a = self.points()[:, :-1, np.newaxis]
+        d = np.diff(self.points(), axis=1)[:, :, np.newaxis]
+        r = p[:, np.newaxis, :] - a # (3, n - 1, M)
+        s = np.clip(np.sum(r*d, axis=0)/np.sum(d*d, axis=0), 0.0, 1.0)
+        return np.min(np.linalg.norm(r - s*d, axis=0), axis=0)
+
+    def reverse(self):
+        """the same curve traversed from the end to the start"""
+        points = self.control[:, -2::-1] if self.closed else self.control[:, ::-1]
+        return Spline(points, closed=self.closed, ds=self.ds, dtheta=self.dtheta)
+
+    def mirror(self, symmetry_plane='xy'):
+        points = np.array([Line.mirror_point(p, symmetry_plane=symmetry_plane)
+                           for p in self.control.T]).T
+        if self.closed:
+            points = points[:, :-1]
+        return Spline(points, closed=self.closed, ds=self.ds, dtheta=self.dtheta)
+
+    # private methods
+    def _reference(self, n=64):
+        """fine parameter grid, n points per knot interval"""
+        u = np.linspace(0.0, 1.0, n + 1)[:-1]
+        t = self.knots[:-1, np.newaxis] + np.diff(self.knots)[:, np.newaxis]*u
+        return np.append(t.ravel(), 1.0)
+
+    def _arc_length(self, t):
+        """cumulative arc length on a fine grid t (trapezoidal rule)"""
+        speed = np.linalg.norm(self.tangent(t), axis=0)
+        return np.concatenate(([0.0], np.cumsum(0.5*(speed[1:] + speed[:-1])*np.diff(t))))
+
+    def _discretize(self):
+        """invert the cumulative node density on a fine grid"""
+        t = self._reference()
+        s = self._arc_length(t)
+        density = np.maximum(1.0/self.ds, self.curvature(t)/self.dtheta)
+        nodes = np.concatenate(([0.0], np.cumsum(
+            0.5*(density[1:] + density[:-1])*np.diff(s))))
+        # odd number of nodes for Simpson's rule
+        n = 2*max(int(np.ceil(nodes[-1]/2)), 1) + 1
+        return np.interp(np.linspace(0.0, nodes[-1], n), nodes, t)
+
+    def __str__(self) -> str:
+        return f'Spline: {self.control.shape[1]} points, {self.get_n()} nodes'
@@ -0,0 +1,346 @@
+import numpy as np
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+
+from OpenAEM.biot_savart import DEFAULT_MEMORY_BUDGET
+from OpenAEM.synthesis import synthesize, influence_reach
+from OpenAEM.velocity_field import grid_vectors, iter_grid_slabs
+from OpenAEM.wall_patch import Wall_Patch
+
+# components of the spectra, (i, j) of E_ij
+SPECTRA_COMPONENTS = {'E11': (0, 0), 'E22': (1, 1), 'E33': (2, 2), 'E13': (0, 2)}
+
+class RunningMoments:
+    def __init__(self, nz) -> None:
+        """running one-point moments of the velocity at every wall distance
+
+        Samples are added batch by batch and the moments of a batch are
+        merged with the accumulated ones, so no sample is stored. Two
+        accumulators of the same grid merge into the moments of all their
+        samples, e.g. the partial results of several nodes.
+
+        Args:
+            nz (int): number of wall-normal grid points
+
+        Formulas:
+            for sets A and B with n = n_A + n_B and d = mean_B - mean_A
+            mean = mean_A + d n_B/n
+            C_ij = C_ij,A + C_ij,B + d_i d_j n_A n_B/n
+            M3 = M3_A + M3_B + d^3 n_A n_B (n_A - n_B)/n^2
+                 + 3 d (n_A M2_B - n_B M2_A)/n
+            M4 = M4_A + M4_B + d^4 n_A n_B (n_A^2 - n_A n_B + n_B^2)/n^3
+                 + 6 d^2 (n_A^2 M2_B + n_B^2 M2_A)/n^2 + 4 d (n_A M3_B - n_B M3_A)/n
+            with C the co-moments sum (u_i - mean_i)(u_j - mean_j) and M2, M3,
+            M4 the central moment sums of each component (Pebay, 2008)
+        """
+        self.count = np.zeros(nz)
+        self.mean = np.zeros((3, nz))
+        self.comoment = np.zeros((3, 3, nz))
+        self.m3 = np.zeros((3, nz))
+        self.m4 = np.zeros((3, nz))
+
+    def update(self, uvv, index=slice(None)):
+        """add samples
+
+        Args:
+            uvv (ndarray): (3, ..., k) velocity samples, the last axis runs
+                over the wall-normal points index, e.g. a (3, nx, ny, k)
+                slab of iter_grid_slabs with axis=2
+            index (slice or ndarray, optional): wall-normal points of the
+                last axis. Defaults to slice(None).
+        """
+        uvv = np.asarray(uvv, dtype=float)
+        uvv = uvv.reshape(3, -1, uvv.shape[-1])
+        mean = uvv.mean(axis=1)
+        d = uvv - mean[:, np.newaxis]
+        d2 = d*d
+        batch = (np.full(uvv.shape[-1], float(uvv.shape[1])), mean,
+                 np.einsum('imk,jmk->ijk', d, d), np.sum(d2*d, axis=1),
+                 np.sum(d2*d2, axis=1))
+        self._combine(index, *batch)
+
+    def merge(self, other):
+        """add the samples of another accumulator of the same grid
+
+        Returns:
+            RunningMoments: self
+        """
+        self._combine(slice(None), other.count, other.mean, other.comoment,
+                      other.m3, other.m4)
+        return self
+
+    def stresses(self):
+        """Reynolds stresses <u_i' u_j'>
+
+        Returns:
+            ndarray: (3, 3, nz)
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.comoment/self.count
+
+    def skewness(self):
+        """<u_i'^3>/<u_i'^2>^(3/2) of every component, (3, nz)"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            m2 = np.diagonal(self.comoment).T/self.count
+            return self.m3/self.count/m2**1.5
+
+    def flatness(self):
+        """<u_i'^4>/<u_i'^2>^2 of every component, (3, nz)"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            m2 = np.diagonal(self.comoment).T/self.count
+            return self.m4/self.count/m2**2
+
+    def save(self, path):
+        """save the accumulator as .npz"""
+        with open(path, 'wb') as f:
+            np.savez(f, count=self.count, mean=self.mean,
+                     comoment=self.comoment, m3=self.m3, m4=self.m4)
+
+    @staticmethod
+    def load(path):
+        """load an accumulator saved by RunningMoments.save"""
+        with np.load(path) as data:
+            moments = RunningMoments(data['count'].size)
+            for name in ('count', 'mean', 'comoment', 'm3', 'm4'):
+                setattr(moments, name, data[name])
+        return moments
+
+    # private methods
+    def _combine(self, index, nb, mb, cb, m3b, m4b):
+        """merge the moments of a set B into the wall-normal points index"""
+        na = self.count[index]; ma = self.mean[:, index]
+        ca = self.comoment[:, :, index]
+        m2a = np.diagonal(ca).T; m2b = np.diagonal(cb).T
+        m3a = self.m3[:, index]; m4a = self.m4[:, index]
+
+        n = na + nb
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fb = np.where(n > 0, nb/n, 0.0)
+            fab = np.where(n > 0, na*nb/n, 0.0)
+        d = mb - ma
+        mean = ma + d*fb
+        comoment = ca + cb + d[:, np.newaxis]*d[np.newaxis, :]*fab
+        m4 = (m4a + m4b + d**4*fab*(1 - 3*fb*(1 - fb))
+              + 6*d**2*(m2b*(1 - fb)**2 + m2a*fb**2) + 4*d*(m3b*(1 - fb) - m3a*fb))
+        m3 = m3a + m3b + d**3*fab*(1 - 2*fb) + 3*d*(m2b*(1 - fb) - m2a*fb)
+
+        self.count[index] = n; self.mean[:, index] = mean
+        self.comoment[:, :, index] = comoment
+        self.m3[:, index] = m3; self.m4[:, index] = m4
+
+class RunningSpectra:
+    def __init__(self, x, y, nz) -> None:
+        """running wall-parallel power spectra at every wall distance
+
+        Every x-y plane is Fourier transformed, its spectra are added to the
+        sums and the plane is discarded. The mean of each plane (the zero
+        wavenumber) is removed, the spectra are those of the fluctuations
+        about the plane average.
+
+        Args:
+            x (ndarray): (nx,) uniform streamwise grid points, the period is
+                nx*dx
+            y (ndarray): (ny,) uniform spanwise grid points, the period is
+                ny*dy
+            nz (int): number of wall-normal grid points
+
+        Formulas:
+            E_ij(kx, ky) = < Re(u_i^ u_j^*) >, u^ = FFT_xy(u)/(nx ny)
+            so that sum over all (kx, ky) of E_ij = < u_i' u_j' >_xy
+
+        Remarks:
+            the field should be periodic in x and y, e.g. synthesized from
+            Wall_Patch.periodic_images, or the spectra contain leakage
+        """
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        dx = self.x[1] - self.x[0]; dy = self.y[1] - self.y[0]
+        if not (np.allclose(np.diff(self.x), dx) and np.allclose(np.diff(self.y), dy)):
+            raise ValueError('the grid must be uniform in x and y')
+        nx, ny = self.x.size, self.y.size
+        self.kx = 2*np.pi*np.fft.fftfreq(nx, dx)
+        self.ky = 2*np.pi*np.fft.rfftfreq(ny, dy)
+        # the half spectrum of rfft counts the negative ky twice
+        self.weight = np.full(self.ky.size, 2.0)
+        self.weight[0] = 1.0
+        if ny % 2 == 0:
+            self.weight[-1] = 1.0
+        self.count = np.zeros(nz)
+        self.sums = np.zeros((len(SPECTRA_COMPONENTS), nx, self.ky.size, nz))
+
+    def update(self, uvv, index=slice(None)):
+        """add the x-y planes of a slab
+
+        Args:
+            uvv (ndarray): (3, nx, ny, k) velocity on k full x-y planes,
+                e.g. a slab of iter_grid_slabs with axis=2
+            index (slice or ndarray, optional): wall-normal points of the
+                planes. Defaults to slice(None).
+        """
+        nx, ny = self.x.size, self.y.size
+        uhat = np.fft.rfft2(uvv, axes=(1, 2))/(nx*ny)
+        uhat[:, 0, 0] = 0.0
+        weight = self.weight[:, np.newaxis]
+        for n, (i, j) in enumerate(SPECTRA_COMPONENTS.values()):
+            self.sums[n, :, :, index] += weight*np.real(uhat[i]*np.conj(uhat[j]))
+        self.count[index] += 1
+
+    def merge(self, other):
+        """add the planes of another accumulator of the same grid
+
+        Returns:
+            RunningSpectra: self
+        """
+        self.sums += other.sums
+        self.count += other.count
+        return self
+
+    def spectrum(self, name):
+        """ensemble averaged 2D spectrum per Fourier mode
+
+        Args:
+            name (str): 'E11', 'E22', 'E33' or 'E13'
+
+        Returns:
+            ndarray: (nx, nky, nz) over (kx, ky), see self.kx and self.ky
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.sums[list(SPECTRA_COMPONENTS).index(name)]/self.count
+
+    def spectrum_1d(self, name, axis=0):
+        """one-sided 1D spectrum along x (axis=0) or y (axis=1)
+
+        Returns:
+            tuple: (k (nk,) non-negative wavenumbers, E (nk, nz) energy per
+                mode, summing to < u_i' u_j' >)
+        """
+        E = self.spectrum(name)
+        if axis == 1:
+            return self.ky, E.sum(axis=0)
+        nx = self.x.size
+        fold = np.abs(np.round(np.fft.fftfreq(nx)*nx)).astype(int)
+        E1 = np.zeros((nx//2 + 1, E.shape[-1]))
+        np.add.at(E1, fold, E.sum(axis=1))
+        return np.abs(self.kx[:nx//2 + 1]), E1
+
+    def premultiplied(self, name, axis=0):
+        """premultiplied 1D spectrum k E(k)
+
+        Returns:
+            tuple: (k (nk,), k E(k) (nk, nz))
+
+        Formulas:
+            k E(k) = k E_mode/dk, dk = 2 pi/L the wavenumber spacing
+        """
+        k, E = self.spectrum_1d(name, axis)
+        dk = k[1] - k[0]
+        return k, k[:, np.newaxis]*E/dk
+
+    def save(self, path):
+        """save the accumulator as .npz"""
+        with open(path, 'wb') as f:
+            np.savez(f, x=self.x, y=self.y, count=self.count, sums=self.sums)
+
+    @staticmethod
+    def load(path):
+        """load an accumulator saved by RunningSpectra.save"""
+        with np.load(path) as data:
+            spectra = RunningSpectra(data['x'], data['y'], data['count'].size)
+            spectra.count = data['count']; spectra.sums = data['sums']
+        return spectra
+
+def ensemble_statistics(grid, eddy, heights, lam, realizations, seed=None,
+                        periodic=True, spectra=True, influence_radius=4.0,
+                        r0=0.1, image=False, slab=1, workers=1,
+                        memory_budget=DEFAULT_MEMORY_BUDGET):
+    """statistics of many random realizations without storing the fields
+
+    Every realization places the eddies of all hierarchy levels on a new
+    wall patch and is synthesized slab by slab of x-y planes. Each slab
+    updates the running moments and spectra and is discarded, so the memory
+    does not grow with the number of realizations.
+
+    Args:
+        grid (tuple[ndarray]): (X, Y, Z) from get_grid or (x, y, z)
+            vectors, e.g. from get_stretched_grid
+        eddy (EddyGeometry, list[DLS] or EddyTemplate): unit eddy
+        heights (ndarray): (L,) hierarchy levels, see
+            Wall_Patch.place_hierarchies
+        lam (float): density of eddies of height 1
+        realizations (int): number of realizations
+        seed (optional): seed of the realizations, realization r uses the
+            r-th child of np.random.SeedSequence(seed), so the result does
+            not depend on workers. Defaults to None.
+        periodic (bool, optional): periodic field in x and y with the box
+            as period, see Wall_Patch.periodic_images. Otherwise the eddies
+            are placed on the box and the margins they reach from. Defaults
+            to True.
+        spectra (bool, optional): accumulate the wall-parallel spectra,
+            needs a grid uniform in x and y. Defaults to True.
+        influence_radius (float, optional): radius of the domain of
+            influence in eddy heights, see synthesize. Defaults to 4.0.
+        r0 (float, optional): cutoff radius in eddy units. Defaults to 0.1.
+        image (bool, optional): add the wall image of every eddy.
+            Defaults to False.
+        slab (int, optional): x-y planes per slab. Defaults to 1.
+        workers (int, optional): number of processes, each runs whole
+            realizations. Defaults to 1.
+        memory_budget (int, optional): bytes allowed for temporaries.
+            Defaults to DEFAULT_MEMORY_BUDGET.
+
+    Returns:
+        tuple: (RunningMoments, RunningSpectra or None)
+    """
+    vectors = grid_vectors(grid)
+    kwargs = dict(heights=np.asarray(heights, dtype=float).reshape(-1), lam=lam,
+                  periodic=periodic, spectra=spectra,
+                  influence_radius=influence_radius, r0=r0, image=image,
+                  slab=slab, memory_budget=memory_budget)
+    task = partial(_realization, vectors, eddy, **kwargs)
+    seeds = np.random.SeedSequence(seed).spawn(realizations)
+
+    moments = RunningMoments(vectors[2].size)
+    spectrum = RunningSpectra(vectors[0], vectors[1], vectors[2].size) if spectra else None
+    if workers == 1:
+        results = map(task, seeds)
+        return _merge_all(results, moments, spectrum)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # merged in realization order so the result does not depend on workers
+        return _merge_all(executor.map(task, seeds), moments, spectrum)
+
+def _merge_all(results, moments, spectrum):
+    for m, s in results:
+        moments.merge(m)
+        if spectrum is not None:
+            spectrum.merge(s)
+    return moments, spectrum
+
+def _realization(vectors, eddy, seed, heights, lam, periodic, spectra,
+                 influence_radius, r0, image, slab, memory_budget):
+    """statistics of one realization"""
+    x, y, z = vectors
+    reach = influence_reach(eddy, influence_radius, image)
+    if periodic:
+        dx = x[1] - x[0]; dy = y[1] - y[0]
+        patch = Wall_Patch(x[0] - 0.5*dx, x[-1] + 0.5*dx,
+                           y[0] - 0.5*dy, y[-1] + 0.5*dy)
+    else:
+        margin = reach[:2]*heights.max()
+        patch = Wall_Patch(x[0] - margin[0], x[-1] + margin[0],
+                           y[0] - margin[1], y[-1] + margin[1])
+    positions, eddy_heights, _ = patch.place_hierarchies(heights, lam, seed=seed)
+    if periodic:
+        positions, eddy_heights, _ = patch.periodic_images(positions, eddy_heights,
+                                                           reach[:2])
+
+    moments = RunningMoments(z.size)
+    spectrum = RunningSpectra(x, y, z.size) if spectra else None
+    for index, (X, Y, Z) in iter_grid_slabs(vectors, axis=2, slab=slab):
+        xv = np.vstack((X.ravel(), Y.ravel(), Z.ravel()))
+        uvv = synthesize(xv, eddy, positions, eddy_heights, r0=r0,
+                         influence_radius=influence_radius, image=image,
+                         memory_budget=memory_budget).reshape((3,) + X.shape)
+        moments.update(uvv, index[2])
+        if spectrum is not None:
+            spectrum.update(uvv, index[2])
+    return moments, spectrum
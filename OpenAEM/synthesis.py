@@ -0,0 +1,185 @@
+import itertools
+import numpy as np
+from functools import partial
+
+from OpenAEM.eddy_geometry import EddyGeometry
+from OpenAEM.biot_savart import biot_savart_eddy, DEFAULT_MEMORY_BUDGET
+
+def synthesize(xv, eddy, positions, heights, r0=0.1, influence_radius=None,
+               out=None, memory_budget=DEFAULT_MEMORY_BUDGET, image=False,
+               gradient=False):
+    """velocity induced by scaled and translated copies of a unit eddy
+
+    Args:
+        xv (float ndarray): (3,) or (3, M) location request
+        eddy (EddyGeometry, list[DLS] or EddyTemplate): unit eddy, any
+            callable mapping (3, M) unit-eddy coordinates to velocity works
+        positions (ndarray): (2, N) wall-parallel eddy positions, e.g. from
+            Wall_Patch.place_eddies
+        heights (float or ndarray): (N,) eddy heights
+        r0 (float, optional): cutoff radius in eddy units. Defaults to 0.1.
+        influence_radius (float, optional): radius of the domain of
+            influence in eddy heights, measured from the eddy centre. Points
+            outside are skipped. Defaults to None (no culling).
+        out (float ndarray, optional): preallocated output with the shape
+            of xv, any memory layout. Defaults to None.
+        memory_budget (int, optional): bytes allowed for temporaries.
+            Defaults to DEFAULT_MEMORY_BUDGET.
+        image (bool, optional): add the wall image of every eddy, see
+            biot_savart_eddy. Only used for eddy geometries, a template or
+            callable must include its image. Defaults to False.
+        gradient (bool, optional): also return the analytic velocity
+            gradient, only for eddy geometries. Defaults to False.
+
+    Returns:
+        float ndarray: (3,) or (3, M) induced velocity, and with gradient
+            the (3, 3) or (3, 3, M) tensor du_i/dx_k
+
+    Formulas:
+        u(x) = sum_k u_1((x - X_k)/h_k), X_k = (x_k, y_k, 0)
+        i.e. every eddy has the same velocity scale, and
+        grad u(x) = sum_k grad u_1((x - X_k)/h_k)/h_k
+
+    Remarks:
+        with culling, the points are indexed by a KD-tree and each eddy is
+        only evaluated at the points inside its domain of influence
+    """
+    xv = np.asarray(xv, dtype=float)
+    if out is None:
+        out = np.zeros(xv.shape)
+    else:
+        out[...] = 0.0
+    if gradient and callable(eddy):
+        raise ValueError('the gradient needs an eddy geometry')
+    grad = np.zeros((3,) + xv.shape) if gradient else None
+    # reshape copies a non-contiguous out, fill a contiguous buffer instead
+    buf = out if out.flags.c_contiguous else np.zeros(out.shape)
+    uvv = buf.reshape(3, -1)
+    xv  = xv.reshape(3, -1)
+
+    unit_field = _unit_field(eddy, r0, memory_budget, image, gradient)
+    origins, heights = placed_origins(positions, heights)
+    if influence_radius is None:
+        pairs = _all_pairs(xv.shape[1], heights.size, memory_budget)
+    else:
+        centre = _eddy_centre(eddy)
+        if image and not callable(eddy):
+            # the eddy and its image are centred on the wall
+            centre = centre*np.array([1.0, 1.0, 0.0])
+        centres = origins + centre[:, np.newaxis]*heights
+        pairs = _local_pairs(xv, centres, influence_radius*heights,
+                             memory_budget)
+
+    for points, eddies in pairs:
+        xi = (xv[:, points] - origins[:, eddies])/heights[eddies]
+        if not gradient:
+            np.add.at(uvv, (slice(None), points), unit_field(xi))
+            continue
+        u, g = unit_field(xi)
+        np.add.at(uvv, (slice(None), points), u)
+        np.add.at(grad.reshape(3, 3, -1), (slice(None), slice(None), points),
+                  g/heights[eddies])
+
+    if buf is not out:
+        out[...] = buf
+    return (out, grad) if gradient else out
+
+def truncation_error(xv, eddy, positions, heights, influence_radius, r0=0.1,
+                     memory_budget=DEFAULT_MEMORY_BUDGET, image=False):
+    """error of the domain-of-influence culling against the uncut sum
+
+    Args:
+        see synthesize
+
+    Returns:
+        dict: 'max' absolute error, 'rms' error and 'relative' rms error
+            normalized by the rms of the uncut velocity
+    """
+    kwargs = dict(r0=r0, memory_budget=memory_budget, image=image)
+    reference = synthesize(xv, eddy, positions, heights, **kwargs)
+    culled = synthesize(xv, eddy, positions, heights,
+                        influence_radius=influence_radius, **kwargs)
+    error = np.linalg.norm(culled - reference, axis=0)
+    rms = np.sqrt(np.mean(error**2))
+    return {'max': np.max(error), 'rms': rms,
+            'relative': rms/np.sqrt(np.mean(np.sum(reference**2, axis=0)))}
+
+def influence_reach(eddy, influence_radius, image=False):
+    """farthest distance from an eddy origin at which the eddy is evaluated
+
+    Args:
+        eddy (EddyGeometry, list[DLS] or EddyTemplate): unit eddy
+        influence_radius (float): see synthesize
+        image (bool, optional): see synthesize. Defaults to False.
+
+    Returns:
+        ndarray: (3,) reach along x, y and z in eddy heights
+    """
+    centre = _eddy_centre(eddy)
+    if image and not callable(eddy):
+        centre = centre*np.array([1.0, 1.0, 0.0])
+    return influence_radius + np.abs(centre)
+
+def placed_origins(positions, heights):
+    """wall origins and heights of placed eddies
+
+    Args:
+        positions (ndarray): (2, N) wall-parallel positions
+        heights (float or ndarray): (N,) eddy heights
+
+    Returns:
+        tuple: (origins (3, N), heights (N,))
+
+    Remarks:
+        the wall-parallel coordinates are the x and y axes of the eddy and
+        the grid, the eddies are attached to the wall z = 0
+    """
+    positions = np.asarray(positions, dtype=float).reshape(2, -1)
+    neddies = positions.shape[1]
+    heights = np.array(np.broadcast_to(heights, (neddies,)), dtype=float)
+    return np.vstack((positions, np.zeros(neddies))), heights
+
+# bytes of temporaries per (point, eddy) pair, besides the unit field
+_PAIR_BYTES = 128
+# eddies per KD-tree query
+_QUERY_BATCH = 1024
+
+def _unit_field(eddy, r0, memory_budget, image=False, gradient=False):
+    """callable velocity of the unit eddy"""
+    if callable(eddy):
+        return eddy
+    return partial(biot_savart_eddy, eddy=EddyGeometry.from_segments(eddy),
+                   r0=r0, memory_budget=memory_budget, image=image,
+                   gradient=gradient)
+
+def _eddy_centre(eddy):
+    """centre of the unit eddy used for the domain of influence"""
+    if hasattr(eddy, 'centre'):
+        return np.asarray(eddy.centre, dtype=float)
+    if callable(eddy):
+        return np.zeros(3)
+    return EddyGeometry.from_segments(eddy).centre
+
+def _all_pairs(npts, neddies, memory_budget):
+    """every (point, eddy) pair in chunks"""
+    size = max(int(memory_budget // _PAIR_BYTES), 1)
+    for start in range(0, npts*neddies, size):
+        pairs = np.arange(start, min(start + size, npts*neddies))
+        yield pairs % npts, pairs // npts
+
+def _local_pairs(xv, centres, radii, memory_budget):
+    """(point, eddy) pairs within the domain of influence in chunks"""
+    from scipy.spatial import cKDTree
+    tree = cKDTree(xv.T)
+    size = max(int(memory_budget // _PAIR_BYTES), 1)
+    neddies = centres.shape[1]
+    for start in range(0, neddies, _QUERY_BATCH):
+        stop = min(start + _QUERY_BATCH, neddies)
+        neighbours = tree.query_ball_point(centres[:, start:stop].T,
+                                           r=radii[start:stop])
+        counts = np.array([len(n) for n in neighbours], dtype=np.intp)
+        points = np.fromiter(itertools.chain.from_iterable(neighbours),
+                             dtype=np.intp, count=counts.sum())
+        eddies = np.repeat(np.arange(start, stop), counts)
+        for first in range(0, points.size, size):
+            yield points[first:first + size], eddies[first:first + size]
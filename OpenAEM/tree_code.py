@@ -0,0 +1,179 @@
+import numpy as np
+
+from OpenAEM.eddy_geometry import EddyGeometry
+from OpenAEM.biot_savart import (_segments_velocity, _SEGMENT_BYTES,
+                                 DEFAULT_MEMORY_BUDGET)
+
+class SegmentTree:
+    def __init__(self, eddy, leaf_size=32) -> None:
+        """octree over straight vortex segments (Barnes-Hut)
+
+        Every node stores the expansion of its segments about the node
+        centre c, up to first order:
+
+            A    = sum_i gamma_i (p1_i - p0_i)
+            M_kl = sum_i gamma_i (m_i - c)_k (p1_i - p0_i)_l
+
+        with m_i the segment midpoint. Both are exact moments of a straight
+        segment.
+
+        Args:
+            eddy (EddyGeometry or list[DLS]): segments, e.g. from
+                EddyGeometry.place for many eddies
+            leaf_size (int, optional): maximum number of segments in a leaf.
+                Defaults to 32.
+        """
+        eddy = EddyGeometry.from_segments(eddy)
+        self.p0 = eddy.p0
+        self.p1 = eddy.p1
+        self.gamma = eddy.gamma
+        self.leaf_size = leaf_size
+
+        # segments are reordered so that every node owns a contiguous range
+        self.order = np.arange(len(eddy))
+        self.start = []; self.stop = []; self.children = []
+        self.centre = []; self.radius = []
+        self.monopole = []; self.dipole = []
+        if len(eddy) > 0:
+            self._build(0, len(eddy))
+
+    def _build(self, start, stop):
+        """build the node owning order[start:stop] and return its index"""
+        node = len(self.start)
+        seg = self.order[start:stop]
+        p0 = self.p0[:, seg]; p1 = self.p1[:, seg]
+        mid = 0.5*(p0 + p1)
+        dl  = self.gamma[seg]*(p1 - p0)
+
+        lo = np.minimum(p0, p1).min(axis=1)
+        hi = np.maximum(p0, p1).max(axis=1)
+        c  = 0.5*(lo + hi)
+        self.start.append(start); self.stop.append(stop)
+        self.children.append([])
+        self.centre.append(c)
+        self.radius.append(0.5*np.linalg.norm(hi - lo))
+        self.monopole.append(dl.sum(axis=1))
+        self.dipole.append((mid - c[:, np.newaxis]) @ dl.T)
+
+        if stop - start <= self.leaf_size:
+            return node
+
+        # split by octant of the midpoints
+        octant = ((mid[0] > c[0]).astype(int) + 2*(mid[1] > c[1])
+                  + 4*(mid[2] > c[2]))
+        if np.all(octant == octant[0]):
+            return node
+        sort = np.argsort(octant, kind='stable')
+        self.order[start:stop] = seg[sort]
+        bounds = np.searchsorted(octant[sort], np.arange(9))
+        for k in range(8):
+            if bounds[k + 1] > bounds[k]:
+                child = self._build(start + bounds[k], start + bounds[k + 1])
+                self.children[node].append(child)
+        return node
+
+    def velocity(self, xv, theta=0.5, r0=0.1, out=None,
+                 memory_budget=DEFAULT_MEMORY_BUDGET):
+        """induced velocity of all segments
+
+        A node is accepted as a cluster if radius < theta*distance, otherwise
+        its children are visited. Leaves are summed directly with the
+        closed-form kernel.
+
+        Args:
+            xv (float ndarray): (3,) or (3, M) location request
+            theta (float, optional): opening angle, smaller is more accurate
+                and theta = 0 is the direct sum. Defaults to 0.5.
+            r0 (float or ndarray, optional): cutoff radius, scalar or one per
+                segment. Defaults to 0.1.
+            out (float ndarray, optional): preallocated output with the shape
+                of xv, any memory layout. Defaults to None.
+            memory_budget (int, optional): bytes allowed for temporaries.
+                Defaults to DEFAULT_MEMORY_BUDGET.
+
+        Returns:
+            float ndarray: (3,) or (3, M) induced velocity
+
+        Remarks:
+            the cutoff only applies to directly summed segments
+        """
+        xv = np.asarray(xv, dtype=float)
+        if out is None:
+            out = np.zeros(xv.shape)
+        else:
+            out[...] = 0.0
+        # reshape copies a non-contiguous out, fill a contiguous buffer instead
+        buf = out if out.flags.c_contiguous else np.zeros(out.shape)
+        uvv = buf.reshape(3, -1)
+        xv  = xv.reshape(3, -1)
+        if len(self.start) == 0:
+            return out
+        r0 = np.broadcast_to(np.asarray(r0, dtype=float), self.gamma.shape)
+
+        stack = [(0, np.arange(xv.shape[1]))]
+        while stack:
+            node, idx = stack.pop()
+            r = xv[:, idx] - self.centre[node][:, np.newaxis]
+            d = np.linalg.norm(r, axis=0)
+            far = self.radius[node] < theta*d
+            if np.any(far):
+                uvv[:, idx[far]] += self._multipole(node, r[:, far], d[far])
+
+            near = idx[~far]
+            if near.size == 0:
+                continue
+            if self.children[node]:
+                stack.extend((child, near) for child in self.children[node])
+                continue
+
+            seg = self.order[self.start[node]:self.stop[node]]
+            size = max(int(memory_budget // (_SEGMENT_BYTES*seg.size)), 1)
+            for first in range(0, near.size, size):
+                pts = near[first:first + size]
+                uvv[:, pts] += _segments_velocity(
+                    xv[:, pts], self.p0[:, seg], self.p1[:, seg],
+                    r0[seg], gamma=self.gamma[seg])
+
+        if buf is not out:
+            out[...] = buf
+        return out
+
+    def _multipole(self, node, r, d):
+        """far-field velocity of a node
+
+        Formulas:
+            u = -1/2 (K x A - T),  K = r/|r|^3
+            T_a = e_abc (J M)_bc,  J = I/|r|^3 - 3 r r^T/|r|^5
+        """
+        A = self.monopole[node]; M = self.dipole[node]
+        K = r/d**3
+        rM = M.T @ r # (3, P), rM_l = r_k M_kl
+        JM = M[:, :, np.newaxis]/d**3 - 3*r[:, np.newaxis, :]*rM[np.newaxis, :, :]/d**5
+        T = np.vstack((JM[1, 2] - JM[2, 1],
+                       JM[2, 0] - JM[0, 2],
+                       JM[0, 1] - JM[1, 0]))
+        return -0.5*(np.cross(K, A[:, np.newaxis], axis=0) - T)
+
+def biot_savart_tree(xv, eddy, r0=0.1, theta=0.5, leaf_size=32, out=None,
+                     memory_budget=DEFAULT_MEMORY_BUDGET):
+    """tree-code counterpart of biot_savart_eddy
+
+    Args:
+        xv (float ndarray): (3,) or (3, M) location request
+        eddy (SegmentTree, EddyGeometry or list[DLS]): a prebuilt tree is
+            reused, anything else is turned into one
+        r0 (float or ndarray, optional): cutoff radius. Defaults to 0.1.
+        theta (float, optional): opening angle. Defaults to 0.5.
+        leaf_size (int, optional): see SegmentTree. Defaults to 32.
+        out (float ndarray, optional): preallocated output with the shape
+            of xv, any memory layout. Defaults to None.
+        memory_budget (int, optional): bytes allowed for temporaries.
+            Defaults to DEFAULT_MEMORY_BUDGET.
+
+    Returns:
+        float ndarray: (3,) or (3, M) induced velocity at xv
+    """
+    if not isinstance(eddy, SegmentTree):
+        eddy = SegmentTree(eddy, leaf_size=leaf_size)
+    return eddy.velocity(xv, theta=theta, r0=r0, out=out,
+                         memory_budget=memory_budget)
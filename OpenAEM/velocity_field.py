@@ -1,6 +1,6 @@
 import numpy as np
 
-def get_grid(Retau, dxp, Lx, Ly, Lz, h):
+def get_grid(Retau, dxp, Lx, Ly, Lz, h, vectors=False):
     """cell centered grid within a box [0, Lx]x[0, Ly]x[0, Lz]
 
     Args:
@@ -10,6 +10,8 @@ def get_grid(Retau, dxp, Lx, Ly, Lz, h):
         Ly (float): domain length
         Lz (float): domain length
         h (float): outer scale
+        vectors (bool, optional): return the (x, y, z) 1d vectors instead of
+            the meshgrid. Defaults to False.
 
     Returns:
         ndarray: (nc, nc, nc) grid points
@@ -21,8 +23,110 @@ def get_grid(Retau, dxp, Lx, Ly, Lz, h):
     y = get_grid_1d(0, Ly, dx)
     z = get_grid_1d(0, Lz, dx)
     
+    if vectors:
+        return x, y, z
     return np.meshgrid(x, y, z, indexing='ij')
     
+def get_stretched_grid(Retau, dxp, Lx, Ly, Lz, h, dyp, dzp_wall, dzp_max,
+                       stretching='tanh', ratio=1.05):
+    """cell centered grid within a box [0, Lx]x[0, Ly]x[0, Lz], stretched
+    away from the wall z = 0
+
+    The grid is returned as 1d vectors, every evaluator taking a grid
+    accepts them and only materializes the points it is working on.
+
+    Args:
+        Retau (float): Retau
+        dxp (float): streamwise resolution in viscous scale
+        Lx (float): domain length
+        Ly (float): domain length
+        Lz (float): domain length
+        h (float): outer scale
+        dyp (float): spanwise resolution in viscous scale
+        dzp_wall (float): wall-normal resolution at the wall in viscous scale
+        dzp_max (float): largest wall-normal resolution in viscous scale
+        stretching (str, optional): 'tanh' or 'geometric', see
+            get_grid_1d_tanh and get_grid_1d_geometric. Defaults to 'tanh'.
+        ratio (float, optional): growth ratio of the geometric stretching.
+            Defaults to 1.05.
+
+    Returns:
+        tuple[ndarray]: (x, y, z) 1d grid points
+    """
+    lnu = compute_lnu(Retau, h)
+    x = get_grid_1d(0, Lx, dxp*lnu)
+    y = get_grid_1d(0, Ly, dyp*lnu)
+    if stretching == 'tanh':
+        z = get_grid_1d_tanh(0, Lz, dzp_wall*lnu, dzp_max*lnu)
+    elif stretching == 'geometric':
+        z = get_grid_1d_geometric(0, Lz, dzp_wall*lnu, dzp_max*lnu, ratio)
+    else:
+        raise ValueError(f'unknown stretching: {stretching}')
+    return x, y, z
+    
+def grid_vectors(grid):
+    """1d coordinate vectors of a tensor-product grid
+
+    Args:
+        grid (tuple[ndarray]): (X, Y, Z) from get_grid or (x, y, z) vectors
+
+    Returns:
+        tuple[ndarray]: (x, y, z) 1d grid points
+    """
+    X, Y, Z = grid
+    if np.ndim(X) == 1:
+        return tuple(np.asarray(c, dtype=float) for c in grid)
+    return X[:, 0, 0], Y[0, :, 0], Z[0, 0, :]
+    
+def iter_grid_slabs(grid, axis=0, slab=1, first=0):
+    """walk through a tensor-product grid slab by slab
+
+    Only the points of the current slab are materialized.
+
+    Args:
+        grid (tuple[ndarray]): (X, Y, Z) from get_grid or (x, y, z) vectors
+        axis (int, optional): 0 for slabs along x, 1 along y, 2 along z.
+            Defaults to 0.
+        slab (int, optional): grid planes per slab. Defaults to 1.
+        first (int, optional): index of the first slab, the slabs before it
+            are skipped without building them. Defaults to 0.
+
+    Yields:
+        tuple: (index, (X, Y, Z)) with index the tuple of slices locating the
+            slab in (nx, ny, nz) arrays and X, Y, Z the slab grid points
+    """
+    vectors = grid_vectors(grid)
+    n = vectors[axis].size
+    for start in range(first*slab, n, slab):
+        index = [slice(None)]*3
+        index[axis] = slice(start, min(start + slab, n))
+        index = tuple(index)
+        local = [c[i] for c, i in zip(vectors, index)]
+        yield index, np.meshgrid(*local, indexing='ij')
+    
+def grid_points(grid, start, stop):
+    """points of a tensor-product grid by flat index
+
+    Args:
+        grid (tuple[ndarray]): (X, Y, Z) from get_grid or (x, y, z) vectors
+        start (int): first flat index, C order of (nx, ny, nz)
+        stop (int): last flat index, excluded
+
+    Returns:
+        float ndarray: (3, stop - start) grid points
+    """
+    if np.ndim(grid[0]) != 1:
+        return np.vstack([np.ravel(c)[start:stop] for c in grid])
+    vectors = grid_vectors(grid)
+    index = np.unravel_index(np.arange(start, stop), tuple(c.size for c in vectors))
+    return np.vstack([c[i] for c, i in zip(vectors, index)])
+    
+def grid_shape(grid):
+    """(nx, ny, nz) of a grid given as meshgrid arrays or 1d vectors"""
+    if np.ndim(grid[0]) == 1:
+        return tuple(np.size(c) for c in grid)
+    return np.shape(grid[0])
+    
 def get_grid_1d(start: float, end: float, target_ds: float):
     """create 1d uniform grid with a target resolution
 
@@ -39,6 +143,82 @@ def get_grid_1d(start: float, end: float, target_ds: float):
     actual_ds = length / nc
     return 0.5*actual_ds + np.arange(nc)*actual_ds
     
+def get_grid_1d_tanh(start: float, end: float, first_ds: float, max_ds: float):
+    """create 1d grid refined near start with a tanh stretching
+
+    The number of cells is the smallest for which the stretching that
+    gives the first cell the width first_ds keeps every cell below max_ds.
+
+    Args:
+        start (float): starting position, the wall
+        end (float): ending position
+        first_ds (float): width of the first cell
+        max_ds (float): largest cell width
+
+    Returns:
+        ndarray: (nc, ) cell centers
+
+    Formulas:
+        faces x_j = start + L*(1 - tanh(beta*(1 - j/nc))/tanh(beta)), j = 0..nc
+        the widest cell is the last one, L*tanh(beta/nc)/tanh(beta)
+    """
+    from scipy.optimize import brentq
+    length = end - start
+    def faces(nc):
+        if first_ds >= length/nc:
+            return np.linspace(0.0, length, nc + 1)
+        xi = np.arange(nc + 1)/nc
+        width = lambda beta: length*(1 - np.tanh(beta*(1 - 1/nc))/np.tanh(beta))
+        beta = brentq(lambda beta: width(beta) - first_ds, 1e-8, 100.0)
+        return length*(1 - np.tanh(beta*(1 - xi))/np.tanh(beta))
+
+    # the last cell narrows as cells are added, bisect on the cell count
+    lo = max(int(np.ceil(length/max_ds)), 1)
+    hi = max(int(np.ceil(length/first_ds)), lo)
+    while lo < hi:
+        mid = (lo + hi)//2
+        if np.diff(faces(mid))[-1] <= max_ds*(1 + 1e-12):
+            hi = mid
+        else:
+            lo = mid + 1
+    x = faces(lo)
+    return start + 0.5*(x[1:] + x[:-1])
+    
+def get_grid_1d_geometric(start: float, end: float, first_ds: float,
+                          max_ds: float, ratio=1.05):
+    """create 1d grid refined near start with a geometric stretching
+
+    The cell widths grow by ratio from first_ds until they reach max_ds and
+    stay constant afterwards. All widths are then scaled down slightly so
+    the cells fill [start, end] exactly.
+
+    Args:
+        start (float): starting position, the wall
+        end (float): ending position
+        first_ds (float): width of the first cell
+        max_ds (float): largest cell width
+        ratio (float, optional): growth ratio of neighbouring cells.
+            Defaults to 1.05.
+
+    Returns:
+        ndarray: (nc, ) cell centers
+
+    Formulas:
+        ds_k = min(first_ds*ratio^k, max_ds)
+    """
+    length = end - start
+    nk = int(np.ceil(np.log(max_ds/first_ds)/np.log(ratio))) if max_ds > first_ds else 0
+    ds = np.minimum(first_ds*ratio**np.arange(nk + 1), max_ds)
+    growth = np.cumsum(ds)
+    if growth[-1] >= length:
+        ds = ds[:np.searchsorted(growth, length) + 1]
+    else:
+        nc = int(np.ceil((length - growth[-1])/max_ds))
+        ds = np.concatenate((ds, np.full(nc, max_ds)))
+    ds *= length/ds.sum()
+    x = np.concatenate(([0.0], np.cumsum(ds)))
+    return start + 0.5*(x[1:] + x[:-1])
+    
 def compute_lnu(Retau: float, h=1.0):
     """compute viscous length scale
 
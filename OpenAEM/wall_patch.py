@@ -15,16 +15,208 @@ class Wall_Patch:
         else:
             rng = np.random.default_rng()
             
-        npts = rng.poisson()
         area = self.area()
         npts = rng.poisson(lam=lam*area)
         x = rng.uniform(self.xmin, self.xmax, size=npts)
         z = rng.uniform(self.zmin, self.zmax, size=npts)
         
         return np.vstack((x, z)) # (2, npts)
+    
+    def place_eddies_poisson_disk(self, radius, lam=None, seed=None, trials=5):
+        """Poisson-disk (blue noise) placement with a minimum separation
+
+        Parallel dart throwing on a background grid of cells of size
+        radius/sqrt(2), so that a cell holds at most one eddy. Cells whose
+        indices are equal modulo 3 cannot conflict and are filled together,
+        every candidate is checked against the neighbouring cells only,
+        so a draw costs O(N).
+
+        Args:
+            radius (float): minimum distance between eddies
+            lam (float, optional): target density, the maximal set is thinned
+                to a Poisson(lam*area) number of eddies. Defaults to None
+                (keep all).
+            seed (optional): seed or Generator. Defaults to None.
+            trials (int, optional): darts per empty cell. Defaults to 5.
+
+        Returns:
+            ndarray: (2, npts) eddy positions
+        """
+        rng = np.random.default_rng(seed)
+        cell = radius/np.sqrt(2)
+        nx = int(np.ceil((self.xmax - self.xmin)/cell))
+        nz = int(np.ceil((self.zmax - self.zmin)/cell))
+
+        # padded so that the 5x5 neighbourhood never leaves the array
+        samples = np.full((2, nx + 4, nz + 4), np.nan)
+        # the corners of the 5x5 block are always farther than radius
+        offsets = np.array([(di, dj) for di in range(-2, 3) for dj in range(-2, 3)
+                            if abs(di*dj) < 4])
+        for _ in range(trials):
+            for a in range(3):
+                for b in range(3):
+                    i, j = np.nonzero(np.isnan(samples[0, 2 + a:nx + 2:3, 2 + b:nz + 2:3]))
+                    i = 3*i + a; j = 3*j + b
+                    x = self.xmin + (i + rng.uniform(size=i.size))*cell
+                    z = self.zmin + (j + rng.uniform(size=j.size))*cell
+                    ni = i[:, np.newaxis] + 2 + offsets[:, 0]
+                    nj = j[:, np.newaxis] + 2 + offsets[:, 1]
+                    d2 = ((samples[0, ni, nj] - x[:, np.newaxis])**2
+                          + (samples[1, ni, nj] - z[:, np.newaxis])**2)
+                    accept = ~np.any(d2 < radius**2, axis=1) \
+                        & (x < self.xmax) & (z < self.zmax)
+                    samples[0, i[accept] + 2, j[accept] + 2] = x[accept]
+                    samples[1, i[accept] + 2, j[accept] + 2] = z[accept]
+
+        pts = samples[:, ~np.isnan(samples[0])]
+        if lam is not None:
+            npts = min(rng.poisson(lam=lam*self.area()), pts.shape[1])
+            pts = pts[:, rng.choice(pts.shape[1], size=npts, replace=False)]
+        return pts # (2, npts)
+    
+    def place_hierarchies(self, heights, lam, seed=None, radius=None):
+        """eddies of several hierarchy levels in one call
+
+        Args:
+            heights (ndarray): (L,) height of each hierarchy level
+            lam (float): density of eddies of height 1, a level of height h
+                gets lam/h**2
+            seed (optional): seed or Generator. Defaults to None.
+            radius (float, optional): minimum distance between eddies of a
+                level in units of its height, see place_eddies_poisson_disk.
+                Defaults to None (uniform Poisson points).
+
+        Returns:
+            tuple: (positions (2, N), heights (N,), levels (N,)) packed over
+                all levels
+        """
+        rng = np.random.default_rng(seed)
+        heights = np.asarray(heights, dtype=float).reshape(-1)
+        if radius is None:
+            counts = rng.poisson(lam=lam*self.area()/heights**2)
+            x = rng.uniform(self.xmin, self.xmax, size=counts.sum())
+            z = rng.uniform(self.zmin, self.zmax, size=counts.sum())
+            pts = np.vstack((x, z))
+        else:
+            pts = [self.place_eddies_poisson_disk(radius*h, lam=lam/h**2, seed=rng)
+                   for h in heights]
+            counts = np.array([p.shape[1] for p in pts])
+            pts = np.hstack(pts)
+        levels = np.repeat(np.arange(heights.size), counts)
+        return pts, heights[levels], levels
         
+    def tile_shape(self, tile_size):
+        """number of tiles along x and z
+
+        Args:
+            tile_size (float or tuple): tile edge, or (dx, dz). Tiles start at
+                (xmin, zmin) and the last ones are clipped to the patch.
+
+        Returns:
+            tuple: (nx, nz)
+        """
+        dx, dz = np.broadcast_to(np.asarray(tile_size, dtype=float), (2,))
+        return (int(np.ceil((self.xmax - self.xmin)/dx)),
+                int(np.ceil((self.zmax - self.zmin)/dz)))
+
+    def tile(self, i, j, tile_size):
+        """the Wall_Patch of tile (i, j)"""
+        dx, dz = np.broadcast_to(np.asarray(tile_size, dtype=float), (2,))
+        return Wall_Patch(self.xmin + i*dx, min(self.xmin + (i + 1)*dx, self.xmax),
+                          self.zmin + j*dz, min(self.zmin + (j + 1)*dz, self.zmax))
+
+    def place_tile(self, i, j, lam, tile_size, seed=None, level=0):
+        """eddies of one tile, reproducible on its own
+
+        The random stream of a tile is the child of the root SeedSequence with
+        spawn key (level, i, j), so a tile gives the same eddies whether it is
+        drawn alone, on another worker or as part of place_eddies_tiled.
+
+        Args:
+            i, j (int): tile index along x and z
+            lam (float): density
+            tile_size (float or tuple): see tile_shape
+            seed (int or SeedSequence, optional): root seed, must be given for
+                results to be reproducible. Defaults to None.
+            level (int, optional): hierarchy level, gives independent streams
+                for the levels of the same tile. Defaults to 0.
+
+        Returns:
+            ndarray: (2, npts) eddy positions
+        """
+        root = _root_sequence(seed)
+        child = np.random.SeedSequence(entropy=root.entropy,
+                                       spawn_key=root.spawn_key + (level, i, j))
+        return self.tile(i, j, tile_size).place_eddies(lam, seed=np.random.default_rng(child))
+
+    def place_eddies_tiled(self, lam, tile_size, seed=None, tiles=None, level=0):
+        """place_eddies with an independent random stream per tile
+
+        Args:
+            lam (float): density
+            tile_size (float or tuple): see tile_shape
+            seed (int or SeedSequence, optional): root seed. Defaults to None.
+            tiles (list[tuple], optional): (i, j) of the tiles to draw.
+                Defaults to None (all tiles).
+            level (int, optional): hierarchy level. Defaults to 0.
+
+        Returns:
+            ndarray: (2, npts) eddy positions, ordered by tile
+        """
+        root = _root_sequence(seed)
+        if tiles is None:
+            nx, nz = self.tile_shape(tile_size)
+            tiles = [(i, j) for i in range(nx) for j in range(nz)]
+        pts = [self.place_tile(i, j, lam, tile_size, seed=root, level=level)
+               for i, j in tiles]
+        return np.hstack([np.zeros((2, 0))] + pts)
+
+    def periodic_images(self, positions, heights, reach):
+        """placed eddies with their periodic images around the patch
+
+        The patch is the period in x and in the second (spanwise)
+        direction. Only the images whose reach overlaps the patch are kept,
+        so evaluating the result with domain-of-influence culling gives the
+        periodic field inside the patch. Compute it once per placement and
+        reuse it for every point.
+
+        Args:
+            positions (ndarray): (2, N) eddy positions inside the patch
+            heights (float or ndarray): (N,) eddy heights
+            reach (float or ndarray): distance from the eddy origin to the
+                edge of its domain of influence in heights, scalar or (2,),
+                e.g. influence_reach(eddy, influence_radius)[:2]
+
+        Returns:
+            tuple: (positions (2, N'), heights (N',), index (N',) of the
+                original eddy), the originals come first
+        """
+        positions = np.asarray(positions, dtype=float).reshape(2, -1)
+        heights = np.broadcast_to(np.asarray(heights, dtype=float), positions.shape[1:])
+        reach = np.broadcast_to(np.asarray(reach, dtype=float), (2,))[:, np.newaxis]*heights
+        lo = np.array([[self.xmin], [self.zmin]])
+        hi = np.array([[self.xmax], [self.zmax]])
+        period = hi - lo
+
+        kmax = np.ceil(reach.max(axis=1, initial=0.0)/period[:, 0]).astype(int)
+        shifts = [(i, j) for i in range(-kmax[0], kmax[0] + 1)
+                  for j in range(-kmax[1], kmax[1] + 1) if (i, j) != (0, 0)]
+        pts = [positions]; index = [np.arange(positions.shape[1])]
+        for shift in shifts:
+            moved = positions + np.array(shift)[:, np.newaxis]*period
+            overlap = np.all((moved + reach > lo) & (moved - reach < hi), axis=0)
+            pts.append(moved[:, overlap]); index.append(np.nonzero(overlap)[0])
+        index = np.concatenate(index)
+        return np.hstack(pts), heights[index], index
+
     def area(self):
         return (self.xmax - self.xmin)*(self.zmax - self.zmin)
             
         
-    
\ No newline at end of file
+    
+
+def _root_sequence(seed):
+    """SeedSequence from an int, a SeedSequence or None (fresh entropy)"""
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    return np.random.SeedSequence(seed)
@@ -13,6 +13,9 @@ setuptools.setup(
     author_email='duosifan@hotmail.com',
     packages=setuptools.find_packages(),
     install_requires=required,
+    entry_points={
+        'console_scripts': ['openaem = OpenAEM.cli:main'],
+    },
     long_description='some markdown',
     long_description_content_type="text/markdown",
     classifiers=[
@@ -0,0 +1,88 @@
+import os
+import sys
+import subprocess
+import numpy as np
+import pytest
+from pytest import approx
+
+import OpenAEM
+from OpenAEM import backends
+
+class Test_Backends:
+    def setup_method(self):
+        rng = np.random.default_rng(seed=12345)
+        self.eddy = OpenAEM.lambda_packet(n=3)
+        self.xv = rng.uniform(-2, 2, (3, 200))
+        self.uv = OpenAEM.biot_savart_eddy(self.xv, self.eddy, backend='numpy')
+
+    def test_float32(self):
+        # far from the origin, the shift keeps single precision accurate
+        shift = np.array([[1e4], [0.0], [0.0]])
+        eddy = OpenAEM.EddyGeometry(self.eddy.p0 + shift, self.eddy.p1 + shift)
+        uv = OpenAEM.biot_savart_eddy(self.xv + shift, eddy, backend='float32')
+        assert(uv.dtype == np.float64)
+        assert(uv == approx(self.uv, rel=1e-4, abs=1e-6))
+
+    def test_set_backend(self):
+        previous = OpenAEM.set_backend('float32')
+        try:
+            assert(OpenAEM.get_backend() is OpenAEM.get_backend('float32'))
+            uv = OpenAEM.biot_savart_eddy(self.xv, self.eddy)
+            assert(uv == approx(self.uv, rel=1e-4, abs=1e-6))
+        finally:
+            OpenAEM.set_backend(previous)
+
+        with pytest.raises(ValueError):
+            OpenAEM.set_backend('fortran')
+        assert(OpenAEM.get_backend() is OpenAEM.get_backend(previous))
+
+    def test_register(self):
+        calls = []
+        def kernel(xv, p0, p1, r0, gamma=1.0):
+            calls.append(p0.shape[1])
+            return OpenAEM.get_backend('numpy')(xv, p0, p1, r0, gamma)
+        OpenAEM.register_backend('counting', kernel)
+        assert('counting' in OpenAEM.available_backends())
+        uv = OpenAEM.biot_savart_eddy(self.xv, self.eddy, backend='counting')
+        assert(uv == approx(self.uv))
+        assert(calls == [len(self.eddy)])
+
+    def test_float32_orientation(self):
+        # the shift does not depend on the direction of the segments
+        shift = np.array([[1e4], [0.0], [0.0]])
+        p0 = self.eddy.p0 + shift; p1 = self.eddy.p1 + shift
+        kernel = OpenAEM.get_backend('float32')
+        uv = kernel(self.xv + shift, p0, p1, 0.1)
+        assert(kernel(self.xv + shift, p1, p0, 0.1) == approx(-uv, rel=1e-4, abs=1e-6))
+        assert(uv == approx(self.uv, rel=1e-4, abs=1e-6))
+
+    def test_fused_kernel(self):
+        # the loop of the numba backend, run as plain Python
+        kernel = backends._fused_segments
+        xv = self.xv[:, :20]
+        S = len(self.eddy)
+        out = np.empty(xv.shape)
+        kernel(xv, self.eddy.p0, self.eddy.p1, np.full(S, 0.1), self.eddy.gamma*np.ones(S), out)
+        assert(out == approx(backends.numpy_segments(xv, self.eddy.p0, self.eddy.p1,
+                                                     0.1, self.eddy.gamma)))
+
+    def test_numba(self, tmp_path):
+        if not backends._numba_installed:
+            assert('numba' not in OpenAEM.available_backends())
+            with pytest.raises(ImportError):
+                OpenAEM.get_backend('numba')
+            pytest.skip('numba is not installed')
+        assert('numba' in OpenAEM.available_backends())
+        # in a subprocess, the numba thread pool must not be forked by the
+        # process pools of later tests
+        root = os.path.dirname(os.path.dirname(OpenAEM.__file__))
+        code = ('import sys, numpy as np, OpenAEM\n'
+                'xv = np.load(sys.argv[1])\n'
+                'eddy = OpenAEM.lambda_packet(n=3)\n'
+                'uv = OpenAEM.biot_savart_eddy(xv, eddy, backend="numba")\n'
+                'print(np.abs(uv - OpenAEM.biot_savart_eddy(xv, eddy)).max())\n')
+        path = os.path.join(tmp_path, 'xv.npy')
+        np.save(path, self.xv)
+        result = subprocess.run([sys.executable, '-c', code, path], cwd=root,
+                                capture_output=True, text=True, check=True)
+        assert(float(result.stdout) < 1e-12)
@@ -14,5 +14,160 @@ class Test_Biot_Savart:
         xv = np.array([1, 0, 0])
         uv = OpenAEM.biot_savart(xv, line)
         assert(uv == approx(np.array([0.0, 1.0, 0.0])))
-        
-        
\ No newline at end of file
+
+    def test_biot_savart_segment_finite_rod(self):
+        # velocity along the x axis of a unit rod on the z axis
+        p0 = np.array([0.0, 0.0, -0.5])
+        p1 = np.array([0.0, 0.0,  0.5])
+        x = np.linspace(0.5, 5.0, 10)
+        xv = np.vstack((x, np.zeros(10), np.zeros(10)))
+        uv = OpenAEM.biot_savart_segment(xv, p0, p1)
+        assert(uv[0] == approx(np.zeros(10), abs=Test_Biot_Savart.ABS_EPS))
+        assert(uv[1] == approx(1/x/np.sqrt(1 + 4*x**2)))
+        assert(uv[2] == approx(np.zeros(10), abs=Test_Biot_Savart.ABS_EPS))
+
+    def test_biot_savart_segment_core(self):
+        p0 = np.array([0.0, 0.0, -0.5])
+        p1 = np.array([0.0, 0.0,  0.5])
+        xv = np.array([[0.0, 0.05, 0.0],
+                       [0.0, 0.0,  0.0],
+                       [0.2, 0.0,  2.0]])
+        uv = OpenAEM.biot_savart_segment(xv, p0, p1)
+        assert(uv == approx(np.zeros((3, 3)), abs=Test_Biot_Savart.ABS_EPS))
+
+    def test_biot_savart_exact_vs_quadrature(self):
+        p0 = np.array([0.0, -0.5, 0.0])
+        p1 = np.array([1.0,  0.0, 1.0])
+        rod = OpenAEM.DLS(p0, p1, ds=0.001)
+        xv = np.array([0.3, 0.7, 0.4])
+        uv_exact = OpenAEM.biot_savart(xv, rod)
+        uv_quad  = OpenAEM.biot_savart(xv, rod, method='quadrature')
+        assert(uv_exact == approx(uv_quad, rel=1e-2))
+
+    def test_biot_savart_eddy_batch(self):
+        eddy = OpenAEM.lambda_packet(n=2)
+        rng = np.random.default_rng(seed=12345)
+        xv = rng.uniform(-2, 2, (3, 50))
+        uv = OpenAEM.biot_savart_eddy(xv, eddy)
+        for i in range(50):
+            assert(uv[:, i] == approx(OpenAEM.biot_savart_eddy(xv[:, i], eddy)))
+
+        # tiny budget forces one point per chunk
+        out = np.zeros((3, 50))
+        uv_chunked = OpenAEM.biot_savart_eddy(xv, eddy, out=out, memory_budget=1)
+        assert(uv_chunked is out)
+        assert(uv_chunked == approx(uv))
+
+    def test_biot_savart_transposed_out(self):
+        eddy = OpenAEM.lambda_packet(n=2)
+        rng = np.random.default_rng(seed=12345)
+        xv = rng.uniform(-2, 2, (3, 4, 5))
+        out = np.zeros((5, 4, 3)).transpose(2, 1, 0)
+        uv = OpenAEM.biot_savart_eddy(xv, eddy, out=out)
+        assert(uv is out)
+        assert(out == approx(OpenAEM.biot_savart_eddy(xv, eddy)))
+        assert(np.abs(out).max() > 0)
+
+        X, Y, Z = OpenAEM.get_grid(10, 1.0, 1.0, 0.5, 0.5, 1.0)
+        out = np.zeros(X.shape[::-1] + (3,)).T
+        OpenAEM.biot_savart_grid((X, Y, Z), eddy, out=out)
+        assert(out == approx(OpenAEM.biot_savart_grid((X, Y, Z), eddy)))
+
+    def test_biot_savart_quadrature_batch(self):
+        p0 = np.array([0.0, 0.0, -0.5])
+        p1 = np.array([0.0, 0.0,  0.5])
+        rod = OpenAEM.DLS(p0, p1, ds=0.001)
+        xv = np.array([[0.5, 1.0], [0.5, 0.0], [0.0, 0.0]])
+        uv_exact = OpenAEM.biot_savart_eddy(xv, [rod])
+        uv_quad  = OpenAEM.biot_savart(xv, rod, method='quadrature')
+        assert(uv_quad == approx(uv_exact, rel=1e-2))
+
+    def test_biot_savart_adaptive(self):
+        rod = OpenAEM.DLS(np.zeros(3), np.array([1.0, 0.5, 0.2]))
+        rng = np.random.default_rng(seed=12345)
+        xv = rng.uniform(-3, 3, (3, 500))
+        uv_exact = OpenAEM.biot_savart(xv, rod)
+        uv_adapt = OpenAEM.biot_savart(xv, rod, method='adaptive', tol=1e-8)
+        assert(uv_adapt == approx(uv_exact, rel=1e-6, abs=1e-10))
+        assert(OpenAEM.biot_savart(xv[:, 0], rod, method='adaptive')
+               == approx(uv_exact[:, 0], rel=1e-4))
+
+        theta = np.linspace(0, 2*np.pi, 13)[:-1]
+        ring = OpenAEM.Spline(np.vstack((np.cos(theta), np.sin(theta),
+                                         np.zeros(12))), closed=True)
+        xv = np.array([[0.0, 0.3, 2.0], [0.0, 0.2, 0.0], [0.0, 0.5, 3.0]])
+        assert(OpenAEM.biot_savart(xv, ring, method='adaptive')
+               == approx(OpenAEM.biot_savart(xv, ring), rel=1e-4, abs=1e-10))
+
+    def test_biot_savart_image(self):
+        eddy = OpenAEM.pi_packet(n=3)
+        rng = np.random.default_rng(seed=12345)
+        xv = rng.uniform(-2, 2, (3, 100))
+        xv[2] = np.abs(xv[2])
+        uv = OpenAEM.biot_savart_eddy(xv, eddy + OpenAEM.mirror_eddy(eddy))
+        assert(OpenAEM.biot_savart_eddy(xv, eddy, image=True, memory_budget=1024)
+               == approx(uv))
+
+        # no penetration through the wall
+        xv[2] = 0.0
+        uv = OpenAEM.biot_savart_eddy(xv, eddy, image=True)
+        assert(uv[2] == approx(np.zeros(100), abs=Test_Biot_Savart.ABS_EPS))
+
+        X, Y, Z = OpenAEM.get_grid(5, 1.0, 1.0, 0.5, 0.5, 1.0)
+        uv = OpenAEM.biot_savart_grid((X, Y, Z), eddy, image=True)
+        xv = np.vstack((X.ravel(), Y.ravel(), Z.ravel()))
+        assert(uv.reshape(3, -1) == approx(OpenAEM.biot_savart_eddy(
+            xv, eddy + OpenAEM.mirror_eddy(eddy))))
+
+    def test_biot_savart_gradient(self):
+        eddy = OpenAEM.pi_packet(n=3)
+        rng = np.random.default_rng(seed=12345)
+        xv = rng.uniform(-1.5, 1.5, (3, 50))
+        xv[2] = np.abs(xv[2])
+        for image in (False, True):
+            uv, grad = OpenAEM.biot_savart_eddy(xv, eddy, image=image,
+                                                gradient=True, memory_budget=4096)
+            assert(uv == approx(OpenAEM.biot_savart_eddy(xv, eddy, image=image)))
+            h = 1e-6
+            for k in range(3):
+                dx = np.zeros((3, 1)); dx[k] = h
+                du = (OpenAEM.biot_savart_eddy(xv + dx, eddy, image=image)
+                      - OpenAEM.biot_savart_eddy(xv - dx, eddy, image=image))/(2*h)
+                assert(grad[:, k] == approx(du, rel=1e-5, abs=1e-7))
+            # divergence free
+            assert(np.trace(grad) == approx(np.zeros(50), abs=1e-10))
+
+        # curves use the differentiated quadrature
+        theta = np.linspace(0, 2*np.pi, 13)[:-1]
+        ring = OpenAEM.Spline(np.vstack((np.cos(theta), np.sin(theta),
+                                         0.3*np.sin(2*theta))), closed=True)
+        xv = np.array([0.2, 0.1, 0.3])
+        uv, grad = OpenAEM.biot_savart_eddy(xv, [ring], gradient=True)
+        assert(grad.shape == (3, 3))
+        for k in range(3):
+            dx = np.zeros(3); dx[k] = 1e-6
+            du = (OpenAEM.biot_savart(xv + dx, ring)
+                  - OpenAEM.biot_savart(xv - dx, ring))/2e-6
+            assert(grad[:, k] == approx(du, rel=1e-5, abs=1e-7))
+
+        # vortex ring: vorticity free outside the core, Q = -1/2 |S|^2
+        omega = OpenAEM.vorticity(grad)
+        assert(omega == approx(np.zeros(3), abs=1e-4))
+        assert(OpenAEM.q_criterion(grad) == approx(
+            -OpenAEM.dissipation(grad, nu=0.25)))
+
+    def test_biot_savart_grid(self):
+        eddy = OpenAEM.lambda_packet(n=2)
+        X, Y, Z = OpenAEM.get_grid(10, 1.0, 1.0, 0.5, 0.5, 1.0)
+        uv = OpenAEM.biot_savart_grid((X, Y, Z), eddy, memory_budget=1024)
+        assert(uv.shape == (3,) + X.shape)
+        xv = np.vstack((X.ravel(), Y.ravel(), Z.ravel()))
+        assert(uv.reshape(3, -1) == approx(OpenAEM.biot_savart_eddy(xv, eddy)))
+
+    def test_biot_savart_grid_vectors(self):
+        eddy = OpenAEM.lambda_packet(n=2)
+        x, y, z = OpenAEM.get_stretched_grid(10, 1.0, 1.0, 0.5, 0.5, 1.0, 0.5, 0.2, 1.0)
+        uv = OpenAEM.biot_savart_grid((x, y, z), eddy, memory_budget=1024)
+        assert(uv.shape == (3, x.size, y.size, z.size))
+        grid = np.meshgrid(x, y, z, indexing='ij')
+        assert(uv == approx(OpenAEM.biot_savart_grid(grid, eddy)))
@@ -0,0 +1,88 @@
+import os
+import sys
+import json
+import subprocess
+import numpy as np
+import pytest
+from pytest import approx
+
+import OpenAEM
+from OpenAEM import cli
+
+class Test_CLI:
+    def setup_method(self):
+        self.config = {'grid': {'Retau': 10.0, 'dxp': 2.5, 'Lx': 1.0,
+                                'Ly': 0.5, 'Lz': 0.5},
+                       'eddy': {'packet': 'lambda', 'n': 2},
+                       'placement': {'heights': [0.5, 0.25], 'lam': 2.0},
+                       'synthesis': {'influence_radius': 3.0},
+                       'seed': 5, 'tile': 2}
+
+    def write(self, tmp_path, config):
+        path = os.path.join(tmp_path, 'run.json')
+        with open(path, 'w') as f:
+            json.dump(config, f)
+        return path
+
+    def reference(self, output):
+        config = cli.load_config(self.write(os.path.dirname(output), self.config))
+        grid = cli.build_grid(config)
+        with np.load(output + '.eddies.npz') as data:
+            positions, heights = data['positions'], data['heights']
+        X, Y, Z = np.meshgrid(*grid, indexing='ij')
+        xv = np.vstack((X.ravel(), Y.ravel(), Z.ravel()))
+        uv = OpenAEM.synthesize(xv, cli.build_eddy(config), positions, heights,
+                                influence_radius=3.0)
+        return uv.reshape((3,) + X.shape)
+
+    def test_run(self, tmp_path):
+        path = self.write(tmp_path, self.config)
+        assert(cli.main(['run', path]) == 0)
+        output = os.path.join(tmp_path, 'field.npy')
+        uv, header = OpenAEM.open_field(output)
+        assert(header['completed'] == 2)
+        assert(uv == approx(self.reference(output)))
+        # the seed fixes the eddies
+        positions, _ = cli.place(cli.load_config(path), cli.build_grid(
+            cli.load_config(path)), cli.build_eddy(cli.load_config(path)))
+        with np.load(output + '.eddies.npz') as data:
+            assert(np.array_equal(data['positions'], positions))
+
+    def test_resume(self, tmp_path):
+        path = self.write(tmp_path, self.config)
+        output = os.path.join(tmp_path, 'field.npy')
+        cli.main(['run', path])
+        # a run killed after the first tile: the finished tile is kept
+        uv = np.load(output, mmap_mode='r+')
+        uv[:, :2] = 7.0; uv[:, 2:] = 0.0; uv.flush(); del uv
+        with open(output + '.json') as f:
+            header = json.load(f)
+        header['completed'] = 1
+        with open(output + '.json', 'w') as f:
+            json.dump(header, f)
+        assert(cli.status(output).endswith('1/2 tiles'))
+
+        cli.main(['run', path])
+        uv = np.load(output)
+        assert(np.all(uv[:, :2] == 7.0))
+        assert(uv[:, 2:] == approx(self.reference(output)[:, 2:]))
+
+        # a different run refuses to resume the file
+        self.config['seed'] = 6
+        path = self.write(tmp_path, self.config)
+        assert(cli.main(['run', path]) == 2)
+        assert(cli.main(['run', path, '--restart']) == 0)
+        assert(np.load(output) == approx(self.reference(output)))
+
+    def test_config(self, tmp_path):
+        with pytest.raises(SystemExit):
+            cli.main(['--help'])
+        assert(cli.main(['status', self.write(tmp_path, {'seed': 1})]) == 0)
+        assert(cli.main(['run', self.write(tmp_path, {'grids': {}})]) == 2)
+        assert(cli.main(['run', self.write(tmp_path, {'eddy': {'packet': 'x'}})]) == 2)
+
+    def test_lazy_imports(self):
+        code = 'import sys, OpenAEM.cli; print(any(m.startswith("scipy") for m in sys.modules))'
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True,
+                                text=True, check=True)
+        assert(result.stdout.strip() == 'False')
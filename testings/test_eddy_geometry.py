@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+from pytest import approx
+
+import OpenAEM
+
+class Test_Eddy_Geometry:
+    def test_lambda_packet(self):
+        eddy = OpenAEM.lambda_packet(l=0.4, alpha=10.0, n=3, beta=45.0)
+        assert(len(eddy) == 6)
+
+        # second vortex, left leg
+        h = 1.0 - 0.4*np.tan(np.deg2rad(10.0))
+        assert(eddy[2].get_p0() == approx(np.array([-0.4, -0.5*h, 0.0])))
+        assert(eddy[2].get_p1() == approx(np.array([-0.4 + h, 0.0, h])))
+        assert(eddy[3].get_p0() == approx(eddy[2].get_p1()))
+
+    def test_pi_packet(self):
+        eddy = OpenAEM.pi_packet(n=2)
+        assert(len(eddy) == 6)
+        for i in [0, 1, 3, 4]:
+            assert(eddy[i].get_p1() == approx(eddy[i + 1].get_p0()))
+        assert(eddy[1].get_dir() == approx(np.array([0.0, 1.0, 0.0])))
+
+    def test_mirror_eddy(self):
+        eddy = OpenAEM.lambda_packet(n=2)
+        mirror = OpenAEM.mirror_eddy(eddy)
+        mirror_list = OpenAEM.mirror_eddy(eddy.to_segments())
+        for curve, line in zip(mirror, mirror_list):
+            assert(curve.get_p0() == approx(line.get_p0()))
+            assert(curve.get_p1() == approx(line.get_p1()))
+
+    def test_transformations(self):
+        p0 = np.array([[0.0], [0.0], [0.0]])
+        p1 = np.array([[1.0], [0.0], [1.0]])
+        eddy = OpenAEM.EddyGeometry(p0, p1)
+
+        moved = eddy.scale(2.0).translate([1.0, 2.0, 0.0])
+        assert(moved.p0[:, 0] == approx(np.array([1.0, 2.0, 0.0])))
+        assert(moved.p1[:, 0] == approx(np.array([3.0, 2.0, 2.0])))
+        assert(moved.ds == approx(np.array([0.02])))
+
+        rotated = eddy.rotate(90.0, axis='z')
+        assert(rotated.p1[:, 0] == approx(np.array([0.0, 1.0, 1.0])))
+
+        reversed_eddy = eddy.reverse()
+        assert(reversed_eddy.p0[:, 0] == approx(p1[:, 0]))
+
+    def test_concatenate(self):
+        eddy = OpenAEM.lambda_packet(n=2)
+        attached_eddy = eddy + OpenAEM.mirror_eddy(eddy)
+        assert(isinstance(attached_eddy, OpenAEM.EddyGeometry))
+        assert(len(attached_eddy) == 8)
+        assert(len(eddy.to_segments() + eddy) == 8)
+
+    def test_biot_savart(self):
+        eddy = OpenAEM.pi_packet(n=3)
+        rng = np.random.default_rng(seed=12345)
+        xv = rng.uniform(-2, 2, (3, 20))
+        uv = OpenAEM.biot_savart_eddy(xv, eddy)
+        assert(uv == approx(OpenAEM.biot_savart_eddy(xv, eddy.to_segments())))
+
+        strong = OpenAEM.EddyGeometry(eddy.p0, eddy.p1, gamma=2.0)
+        assert(OpenAEM.biot_savart_eddy(xv, strong) == approx(2*uv))
+
+    def test_placed_circulation(self):
+        eddy = OpenAEM.lambda_packet()
+        placed = eddy.place(np.zeros((2, 1)), 0.5)
+        assert(placed[:3].gamma == approx(0.5*np.ones(3)))
+        with pytest.raises(ValueError):
+            placed[0]
+        with pytest.raises(ValueError):
+            placed.to_segments()
+        assert(len(list(eddy)) == len(eddy))
@@ -0,0 +1,53 @@
+import os
+import numpy as np
+from pytest import approx
+
+import OpenAEM
+from OpenAEM.eddy_template import stretched_axis
+
+class Test_Eddy_Template:
+    def test_stretched_axis(self):
+        x = stretched_axis(0.5, 20.0, 65, core=0.5)
+        assert(x[0] == approx(-19.5))
+        assert(x[-1] == approx(20.5))
+        assert(x[32] == approx(0.5))
+        dx = np.diff(x)
+        assert(dx[-1] > 10*dx[32])
+
+    def test_interpolation(self):
+        eddy = OpenAEM.lambda_packet(n=2)
+        template = OpenAEM.EddyTemplate.build(eddy, n=48)
+        xv = np.array([[2.0, -1.5, 0.5],
+                       [1.0,  0.5, 2.0],
+                       [1.5,  1.0, 2.5]])
+        uv = OpenAEM.biot_savart_eddy(xv, eddy)
+        assert(template(xv) == approx(uv, rel=0.05, abs=1e-3))
+        assert(template(np.array([100.0, 0.0, 0.0])) == approx(np.zeros(3)))
+
+    def test_induced_velocity(self):
+        eddy = OpenAEM.lambda_packet(n=2)
+        template = OpenAEM.EddyTemplate.build(eddy, n=48)
+        positions = np.array([[0.0, 3.0], [0.0, 1.0]])
+        heights = np.array([1.0, 2.0])
+        xv = np.array([[2.0, -1.5], [1.0, 3.0], [1.5, 1.0]])
+
+        # a copy scaled by h carries h times the circulation
+        placed = eddy + OpenAEM.EddyGeometry(
+            2*eddy.p0 + np.array([[3.0], [1.0], [0.0]]),
+            2*eddy.p1 + np.array([[3.0], [1.0], [0.0]]), gamma=2.0)
+        uv = OpenAEM.biot_savart_eddy(xv, placed)
+        assert(template.induced_velocity(xv, positions, heights)
+               == approx(uv, rel=0.05, abs=1e-3))
+
+    def test_cached(self, tmp_path):
+        eddy = OpenAEM.lambda_packet(n=2)
+        path = os.path.join(tmp_path, 'template.npz')
+        template = OpenAEM.EddyTemplate.cached(path, eddy, n=16)
+        assert(os.path.exists(path))
+
+        loaded = OpenAEM.EddyTemplate.cached(path, eddy, n=16)
+        assert(loaded.velocity == approx(template.velocity))
+
+        # different geometry must not reuse the file
+        other = OpenAEM.EddyTemplate.cached(path, eddy.scale(0.5), n=16)
+        assert(not np.allclose(other.velocity, template.velocity))
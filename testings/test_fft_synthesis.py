@@ -0,0 +1,50 @@
+import numpy as np
+from pytest import approx
+
+import OpenAEM
+import OpenAEM.velocity_field as velocity_field
+
+class Test_FFT_Synthesis:
+    def setup_method(self):
+        self.eddy = OpenAEM.lambda_packet(n=2)
+        self.x = velocity_field.get_grid_1d(0.0, 8.0, 0.25)
+        self.y = velocity_field.get_grid_1d(0.0, 4.0, 0.25)
+        self.z = np.array([0.1, 0.4, 0.8])
+
+    def test_grid_aligned(self):
+        # eddies on grid points, reference uses the minimum image
+        positions = np.array([[self.x[3], self.x[20]], [self.y[5], self.y[12]]])
+        heights = np.array([0.5, 1.0])
+        uv = OpenAEM.fft_synthesize((self.x, self.y, self.z), self.eddy,
+                                    positions, heights)
+
+        X, Y, Z = np.meshgrid(self.x, self.y, self.z, indexing='ij')
+        reference = np.zeros_like(uv)
+        for k in range(2):
+            ox = np.mod(X - positions[0, k] + 4.0, 8.0) - 4.0
+            oy = np.mod(Y - positions[1, k] + 2.0, 4.0) - 2.0
+            xi = np.vstack((ox.ravel(), oy.ravel(), Z.ravel()))/heights[k]
+            reference += OpenAEM.biot_savart_eddy(xi, self.eddy).reshape(uv.shape)
+        assert(uv == approx(reference, abs=1e-10))
+
+    def test_translation(self):
+        synthesizer = OpenAEM.FFTSynthesizer((self.x, self.y, self.z), self.eddy)
+        positions = np.array([[1.1, 5.3], [0.6, 2.2]])
+        uv = synthesizer(positions, 0.5)
+        shifted = synthesizer(positions + np.array([[0.5], [0.25]]), 0.5)
+        assert(np.roll(uv, (2, 1), axis=(1, 2)) == approx(shifted))
+        assert(list(synthesizer.footprints) == [0.5])
+
+    def test_image(self):
+        grid = (self.x, self.y, self.z)
+        positions = np.array([[self.x[3]], [self.y[5]]])
+        uv = OpenAEM.fft_synthesize(grid, self.eddy, positions, 0.5, image=True)
+        real = OpenAEM.fft_synthesize(grid, self.eddy, positions, 0.5)
+
+        X, Y, Z = np.meshgrid(self.x, self.y, self.z, indexing='ij')
+        ox = np.mod(X - positions[0, 0] + 4.0, 8.0) - 4.0
+        oy = np.mod(Y - positions[1, 0] + 2.0, 4.0) - 2.0
+        xi = np.vstack((ox.ravel(), oy.ravel(), Z.ravel()))/0.5
+        reference = OpenAEM.biot_savart_eddy(xi, self.eddy, image=True)
+        assert(uv == approx(reference.reshape(uv.shape), abs=1e-10))
+        assert(np.abs(uv - real).max() > 0)
@@ -0,0 +1,82 @@
+import os
+import numpy as np
+from functools import partial
+from pytest import approx, raises
+
+import OpenAEM
+
+class Test_Field_IO:
+    def setup_method(self):
+        self.field = partial(OpenAEM.biot_savart_eddy,
+                             eddy=OpenAEM.lambda_packet(n=2))
+        self.grid = (np.linspace(-1, 2, 6), np.linspace(-1, 1, 5),
+                     np.linspace(0.05, 1, 4))
+
+    def test_iter_grid_slabs(self):
+        X, Y, Z = np.meshgrid(*self.grid, indexing='ij')
+        n = 0
+        for index, (Xs, Ys, Zs) in OpenAEM.iter_grid_slabs(self.grid, axis=1, slab=2):
+            assert(Xs == approx(X[index]))
+            assert(Ys == approx(Y[index]))
+            assert(Zs == approx(Z[index]))
+            n += Xs.shape[1]
+        assert(n == 5)
+        index, _ = next(OpenAEM.iter_grid_slabs(self.grid, axis=1, slab=2, first=2))
+        assert(index[1] == slice(4, 5))
+
+    def test_stream_field(self, tmp_path):
+        path = os.path.join(tmp_path, 'uv.npy')
+        OpenAEM.stream_field(path, self.grid, self.field, axis=1, slab=2,
+                             metadata={'Retau': 1000})
+        uv, header = OpenAEM.open_field(path)
+        assert(isinstance(uv, np.memmap))
+        assert(header['metadata']['Retau'] == 1000)
+        assert(header['completed'] == 3)
+
+        X, Y, Z = np.meshgrid(*self.grid, indexing='ij')
+        xv = np.vstack((X.ravel(), Y.ravel(), Z.ravel()))
+        assert(uv.reshape(3, -1) == approx(self.field(xv)))
+
+    def test_resume(self, tmp_path):
+        path = os.path.join(tmp_path, 'uv.npy')
+        calls = []
+        def failing(xv):
+            calls.append(xv.shape[1])
+            if len(calls) == 4:
+                raise RuntimeError('node failure')
+            return self.field(xv)
+
+        with raises(RuntimeError):
+            OpenAEM.stream_field(path, self.grid, failing)
+        _, header = OpenAEM.open_field(path)
+        assert(header['completed'] == 3)
+
+        calls.clear()
+        OpenAEM.stream_field(path, self.grid, self.field_counting(calls))
+        assert(len(calls) == 3)
+        uv, _ = OpenAEM.open_field(path)
+        X, Y, Z = np.meshgrid(*self.grid, indexing='ij')
+        xv = np.vstack((X.ravel(), Y.ravel(), Z.ravel()))
+        assert(uv.reshape(3, -1) == approx(self.field(xv)))
+
+    def test_resume_metadata(self, tmp_path):
+        path = os.path.join(tmp_path, 'uv.npy')
+        calls = []
+        OpenAEM.stream_field(path, self.grid, self.field, metadata={'seed': 1})
+        # a finished run is not recomputed and stays complete
+        OpenAEM.stream_field(path, self.grid, self.field_counting(calls),
+                             metadata={'seed': 1})
+        assert(calls == [])
+        assert(OpenAEM.open_field(path)[1]['completed'] == 6)
+
+        # another run on the same grid starts from slab 0
+        OpenAEM.stream_field(path, self.grid, self.field_counting(calls),
+                             metadata={'seed': 2})
+        assert(len(calls) == 6)
+        assert(OpenAEM.open_field(path)[1]['metadata'] == {'seed': 2})
+
+    def field_counting(self, calls):
+        def field(xv):
+            calls.append(xv.shape[1])
+            return self.field(xv)
+        return field
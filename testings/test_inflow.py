@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from pytest import approx
+
+import OpenAEM
+
+class Test_Frozen_Turbulence:
+    def setup_method(self):
+        self.grid = (np.arange(24)*0.1, np.linspace(0, 1, 8), np.linspace(0.05, 1, 6))
+        self.eddy = OpenAEM.lambda_packet(n=2)
+        self.inflow = OpenAEM.FrozenTurbulence(self.grid, self.eddy, [0.5, 1.0],
+                                               lam=1.0, convection=2.0,
+                                               influence_radius=3.0, seed=3)
+
+    def reference(self):
+        X, Y, Z = np.meshgrid(*self.grid, indexing='ij')
+        xv = np.vstack((X.ravel(), Y.ravel(), Z.ravel()))
+        uv = OpenAEM.synthesize(xv, self.eddy, self.inflow.positions,
+                                self.inflow.heights, influence_radius=3.0)
+        return uv.reshape(self.inflow.shape())
+
+    def test_step(self):
+        assert(self.inflow.field == approx(self.reference()))
+        for shift in (1, 3, 2):
+            self.inflow.step(shift)
+        assert(self.inflow.time == approx(0.6/2.0))
+        assert(self.inflow.field == approx(self.reference()))
+        # eddies beyond the reach of the box are dropped
+        assert(np.all(self.inflow.positions[0] < self.inflow.patch.xmax))
+
+        self.inflow.step(30)
+        assert(self.inflow.field == approx(self.reference()))
+
+        before = self.inflow.field.copy()
+        assert(self.inflow.step(0) == approx(before))
+        assert(self.inflow.time == approx(3.6/2.0))
+        with pytest.raises(ValueError):
+            self.inflow.step(-1)
+
+    def test_frames(self):
+        frames = list(self.inflow.frames(3, shift=2, plane=5))
+        assert(len(frames) == 3)
+        time, plane = frames[-1]
+        assert(time == approx(0.3))
+        assert(plane == approx(self.inflow.field[:, 5]))
+
+    def test_uniform(self):
+        with pytest.raises(ValueError):
+            OpenAEM.FrozenTurbulence((np.array([0.0, 0.1, 0.3]),) + self.grid[1:],
+                                     self.eddy, [1.0], lam=1.0)
+
+    def test_arguments(self):
+        with pytest.raises(ValueError):
+            OpenAEM.FrozenTurbulence(self.grid, self.eddy, [1.0], lam=1.0,
+                                     influence_radius=None)
+        for convection in (0.0, -1.0):
+            with pytest.raises(ValueError):
+                OpenAEM.FrozenTurbulence(self.grid, self.eddy, [1.0], lam=1.0,
+                                         convection=convection)
@@ -0,0 +1,52 @@
+import numpy as np
+from pytest import approx
+
+import OpenAEM
+
+class Test_Intensity:
+    def setup_method(self):
+        eddy = OpenAEM.lambda_packet(n=2)
+        self.eddy = eddy + OpenAEM.mirror_eddy(eddy)
+        self.x = np.linspace(-2, 2, 21)
+        self.y = np.linspace(-2, 2, 17)
+        self.z = np.linspace(0, 1, 6)
+        OpenAEM.intensity.clear_cache()
+
+    def test_plane_averages(self):
+        I = OpenAEM.intensity_function(self.eddy, self.x, self.y, self.z,
+                                       slab=4)
+        X, Y, Z = np.meshgrid(self.x, self.y, self.z, indexing='ij')
+        xv = np.vstack((X.ravel(), Y.ravel(), Z.ravel()))
+        U, V, W = OpenAEM.biot_savart_eddy(xv, self.eddy).reshape((3,) + X.shape)
+        assert(I['I11'] == approx(np.mean(U*U, axis=(0, 1))))
+        assert(I['I22'] == approx(np.mean(V*V, axis=(0, 1))))
+        assert(I['I33'] == approx(np.mean(W*W, axis=(0, 1))))
+        assert(I['I13'] == approx(np.mean(U*W, axis=(0, 1))))
+        # no penetration at the wall
+        assert(I['I33'][0] == approx(0.0, abs=1e-12))
+
+    def test_parallel_and_cache(self, tmp_path):
+        I = OpenAEM.intensity_function(self.eddy, self.x, self.y, self.z,
+                                       workers=2, slab=3, cache_dir=tmp_path)
+        assert(len(list(tmp_path.iterdir())) == 1)
+        OpenAEM.intensity.clear_cache()
+        serial = OpenAEM.intensity_function(self.eddy, self.x, self.y, self.z,
+                                            slab=3)
+        assert(I['I11'] == approx(serial['I11']))
+
+        # cached result is returned even for a fresh session
+        OpenAEM.intensity.clear_cache()
+        cached = OpenAEM.intensity_function(self.eddy, self.x, self.y, self.z,
+                                            cache_dir=tmp_path)
+        assert(cached['I13'] == approx(I['I13']))
+
+    def test_session_cache(self, monkeypatch):
+        I = OpenAEM.intensity_function(self.eddy, self.x, self.y, self.z)
+        I['I11'] *= 2
+        again = OpenAEM.intensity_function(self.eddy, self.x, self.y, self.z)
+        assert(again['I11'] == approx(0.5*I['I11']))
+
+        monkeypatch.setattr(OpenAEM.intensity, 'CACHE_SIZE', 2)
+        for r0 in (0.05, 0.2, 0.3):
+            OpenAEM.intensity_function(self.eddy, self.x, self.y, self.z, r0=r0)
+        assert(len(OpenAEM.intensity._cache) == 2)
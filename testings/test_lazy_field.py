@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from pytest import approx
+
+import OpenAEM
+
+class Test_Lazy_Field:
+    def setup_method(self):
+        rng = np.random.default_rng(seed=7)
+        self.grid = (np.linspace(0, 2, 9), np.linspace(0, 2, 7),
+                     np.linspace(0.05, 1, 5))
+        self.kwargs = dict(eddy=OpenAEM.lambda_packet(n=2),
+                           positions=rng.uniform(0, 2, (2, 10)),
+                           heights=rng.uniform(0.2, 1.0, 10),
+                           influence_radius=3.0)
+        self.field = OpenAEM.VelocityField.from_eddies(self.grid, tile=(4, 3, 2),
+                                                       **self.kwargs)
+        X, Y, Z = np.meshgrid(*self.grid, indexing='ij')
+        xv = np.vstack((X.ravel(), Y.ravel(), Z.ravel()))
+        self.reference = OpenAEM.synthesize(xv, **self.kwargs).reshape(3, 9, 7, 5)
+
+    def test_indexing(self):
+        assert(self.field.misses == 0)
+        for key in [(0, slice(None), 3), (Ellipsis, -1), (slice(None), 2, 5, 4),
+                    (slice(1, 3), slice(1, 8, 3), Ellipsis, slice(None, None, -2)),
+                    (2, [0, 8, 3])]:
+            assert(self.field[key] == approx(self.reference[key]))
+        assert(np.asarray(self.field) == approx(self.reference))
+        with pytest.raises(IndexError):
+            self.field[0, 0, 0, 0, 0]
+
+    def test_lazy(self):
+        self.field[0, :, 3, :]
+        # the plane y[3] lies in the second layer of tiles
+        assert(self.field.misses == 3*3)
+        assert(set(b[1] for b in self.field.tiles) == {1})
+        self.field[1, 2:5, 3, 0]
+        assert(self.field.misses == 9 and self.field.hits == 2)
+
+    def test_lru(self):
+        one = 3*4*3*2*8
+        field = OpenAEM.VelocityField.from_eddies(self.grid, tile=(4, 3, 2),
+                                                  max_bytes=2*one, **self.kwargs)
+        field[:, 0, 0, 0]; field[:, 4, 0, 0]; field[:, 0, 0, 0]
+        field[:, 8, 0, 0]
+        # the least recently used tile (1, 0, 0) was evicted
+        assert(list(field.tiles) == [(0, 0, 0), (2, 0, 0)])
+        # the last tile holds a single x plane
+        assert(field.nbytes == one + one//4)
+        assert(field[:, 4, 0, 0] == approx(self.reference[:, 4, 0, 0]))
+        assert(field.misses == 4)
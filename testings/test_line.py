@@ -1,6 +1,10 @@
+import copy
+import pickle
 import OpenAEM
 from pytest import approx
 import numpy as np
+import pytest
+from scipy import integrate
 
 class Test_Line:
     ABS_EPS = 1e-10
@@ -130,5 +134,47 @@ class Test_Line:
         
         assert(line.mirror(symmetry_plane='xy').get_p0() == approx(np.array([0, 0, -1])))
         assert(line.mirror(symmetry_plane='xy').get_p1() == approx(np.array([1, 0, -1])))
-        
-    
\ No newline at end of file
+
+    def test_immutable(self):
+        p0 = np.array([0.0, 0.0, 0.0])
+        p1 = np.array([1.0, 0.0, 0.0])
+        line = OpenAEM.DLS(p0, p1, ds=0.2)
+        p0[0] = 5.0 # the line keeps its own copy
+        assert(line.get_p0() == approx(np.zeros(3)))
+        assert(not hasattr(line, '__dict__'))
+        with pytest.raises(AttributeError):
+            line.ds = 0.1
+        assert(line.points() is line.points())
+        for array in (line.get_p0(), line.get_t(), line.points(), line.dirs(),
+                      line.weights()):
+            with pytest.raises(ValueError):
+                array[0] = 1.0
+
+    def test_weights(self):
+        p0 = np.array([0.0, 0.0, 0.0])
+        p1 = np.array([1.0, 1.0, 0.0])
+        for ds in (0.2, 0.15, 0.5, 1.0):
+            line = OpenAEM.DLS(p0, p1, ds=ds)
+            f = np.sin(3*line.get_t())
+            assert(f @ line.weights() == approx(integrate.simpson(f, x=line.get_t())))
+
+
+    def test_pickle(self):
+        p0 = np.array([0.0, 0.0, 0.0])
+        p1 = np.array([1.0, 1.0, 0.0])
+        dls = OpenAEM.DLS(p0, p1, ds=0.15)
+        dls.points()
+        for line in (OpenAEM.Line(p0, p1), dls):
+            for clone in (pickle.loads(pickle.dumps(line)), copy.copy(line),
+                          copy.deepcopy(line)):
+                assert(type(clone) is type(line))
+                assert(clone.get_p0() == approx(p0))
+                assert(clone.get_p1() == approx(p1))
+                with pytest.raises(AttributeError):
+                    clone.p0 = p1
+                with pytest.raises(ValueError):
+                    clone.get_p0()[0] = 1.0
+        clone = pickle.loads(pickle.dumps(dls))
+        assert(clone.get_n() == dls.get_n())
+        assert(clone.points() == approx(dls.points()))
+        assert(clone.weights() == approx(dls.weights()))
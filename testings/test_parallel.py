@@ -0,0 +1,39 @@
+import os
+import numpy as np
+from functools import partial
+
+import OpenAEM
+
+class Test_Parallel:
+    def setup_method(self):
+        rng = np.random.default_rng(seed=12345)
+        eddy = OpenAEM.lambda_packet(n=2)
+        self.field = partial(OpenAEM.synthesize, eddy=eddy,
+                             positions=rng.uniform(0, 2, (2, 10)),
+                             heights=rng.uniform(0.2, 1.0, 10),
+                             influence_radius=3.0)
+        self.grid = (np.linspace(0, 2, 9), np.linspace(0, 2, 7),
+                     np.linspace(0.05, 1, 5))
+
+    def test_deterministic(self):
+        serial = OpenAEM.parallel_field(self.grid, self.field, workers=1)
+        X, Y, Z = np.meshgrid(*self.grid, indexing='ij')
+        xv = np.vstack((X.ravel(), Y.ravel(), Z.ravel()))
+        assert(np.allclose(serial.reshape(3, -1), self.field(xv)))
+
+        for workers, slab in [(2, None), (3, 1)]:
+            uv = OpenAEM.parallel_field(self.grid, self.field,
+                                        workers=workers, slab=slab)
+            assert(np.array_equal(uv, serial))
+
+    def test_memmap(self, tmp_path):
+        path = os.path.join(tmp_path, 'uv.npy')
+        out = np.lib.format.open_memmap(path, mode='w+', shape=(3, 9, 7, 5))
+        OpenAEM.parallel_field(self.grid, self.field, workers=2, out=out)
+        serial = OpenAEM.parallel_field(self.grid, self.field, workers=1)
+        assert(np.array_equal(np.load(path), serial))
+
+    def test_empty(self):
+        grid = (self.grid[0], np.array([]), self.grid[2])
+        uv = OpenAEM.parallel_field(grid, self.field, workers=2)
+        assert(uv.shape == (3, 9, 0, 5))
@@ -0,0 +1,49 @@
+import numpy as np
+from pytest import approx
+
+import OpenAEM
+
+class Test_Probes:
+    def setup_method(self):
+        patch = OpenAEM.Wall_Patch(0.0, 20.0, 0.0, 6.0)
+        self.eddy = OpenAEM.lambda_packet(n=2)
+        self.positions, self.heights, levels = patch.place_hierarchies(
+            [0.25, 0.5, 1.0], lam=0.5, seed=1)
+        self.convection = np.array([0.6, 0.7, 0.8])[levels]
+        self.probes = np.array([[10.0, 3.0, 0.1], [10.0, 3.0, 0.4],
+                                [11.0, 2.0, 0.8]]).T
+        self.times = np.linspace(0, 4, 9)
+
+    def test_series(self):
+        uv = OpenAEM.probe_series(self.probes, self.eddy, self.positions,
+                                  self.heights, self.times,
+                                  convection=self.convection,
+                                  influence_radius=4.0, memory_budget=4096)
+        assert(uv.shape == (3, 3, 9))
+        for j, t in enumerate(self.times):
+            positions = self.positions + np.vstack((self.convection*t,
+                                                    np.zeros_like(self.heights)))
+            uv_t = OpenAEM.synthesize(self.probes, self.eddy, positions,
+                                      self.heights, influence_radius=4.0)
+            assert(uv[:, :, j] == approx(uv_t.T))
+
+    def test_no_culling(self):
+        uv = OpenAEM.probe_series(self.probes, self.eddy, self.positions,
+                                  self.heights, self.times[:2], convection=0.7,
+                                  image=True)
+        uv_0 = OpenAEM.synthesize(self.probes, self.eddy, self.positions,
+                                  self.heights, image=True)
+        assert(uv[:, :, 0] == approx(uv_0.T))
+
+    def test_probe_on_eddy(self):
+        # with a zero radius only the eddy whose centre is the probe counts
+        centre = OpenAEM.EddyGeometry.from_segments(self.eddy).centre
+        k = 5
+        probe = (np.append(self.positions[:, k], 0.0)
+                 + centre*self.heights[k])[:, np.newaxis]
+        with np.errstate(all='raise'):
+            uv = OpenAEM.probe_series(probe, self.eddy, self.positions,
+                                      self.heights, [0.0], influence_radius=0.0)
+        uv_k = OpenAEM.synthesize(probe, self.eddy, self.positions[:, k:k + 1],
+                                  self.heights[k:k + 1])
+        assert(uv[0, :, 0] == approx(uv_k[:, 0]))
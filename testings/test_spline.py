@@ -0,0 +1,60 @@
+import numpy as np
+from pytest import approx
+
+import OpenAEM
+
+class Test_Spline:
+    def setup_method(self):
+        theta = np.linspace(0, 2*np.pi, 13)[:-1]
+        self.ring = OpenAEM.Spline(np.vstack((np.cos(theta), np.sin(theta),
+                                              np.zeros(12))), closed=True)
+
+    def test_straight(self):
+        curve = OpenAEM.Spline(np.array([[0.0, 0.0, 0.0], [0.5, 0.0, 0.0],
+                                         [1.0, 0.0, 0.0]]).T)
+        xv = np.array([[0.3, 0.4, 0.2], [1.2, -0.3, 0.5]]).T
+        assert(curve.get_n() == 21)
+        assert(curve.distance2pt(xv[:, 0]) == approx(np.hypot(0.4, 0.2)))
+        assert(OpenAEM.biot_savart(xv, curve) == approx(
+            OpenAEM.biot_savart_segment(xv, np.zeros(3), np.array([1.0, 0.0, 0.0])),
+            rel=1e-5))
+
+    def test_ring(self):
+        assert(self.ring.get_length() == approx(2*np.pi, rel=1e-3))
+        assert(self.ring.distance2pt(np.zeros(3)) == approx(1.0, rel=1e-3))
+        # vortex ring of circulation 2*pi: u = pi/R at the centre
+        assert(OpenAEM.biot_savart(np.zeros(3), self.ring)
+               == approx(np.array([0.0, 0.0, np.pi]), rel=1e-3, abs=1e-10))
+        # the cached samples are reused
+        assert(self.ring.points() is self.ring.points())
+
+        reverse = self.ring.reverse()
+        xv = np.array([0.3, 0.2, 0.5])
+        assert(OpenAEM.biot_savart(xv, reverse)
+               == approx(-OpenAEM.biot_savart(xv, self.ring)))
+        mirror = self.ring.mirror(symmetry_plane='xy')
+        assert(mirror.points() == approx(self.ring.points(), abs=1e-12))
+
+    def test_adaptive(self):
+        # hairpin with a tight head: nodes cluster where the curvature is high
+        legs = np.linspace(0, 1, 6)
+        head = np.linspace(np.pi, 0, 9)
+        pts = np.hstack((np.vstack((-0.05*np.ones(6), np.zeros(6), legs)),
+                         np.vstack((0.05*np.cos(head), np.zeros(9),
+                                    1.0 + 0.05*np.sin(head)))[:, 1:-1],
+                         np.vstack((0.05*np.ones(6), np.zeros(6), legs[::-1]))))
+        hairpin = OpenAEM.Spline(pts, dtheta=0.1)
+        z = hairpin.points()[2]
+        head_nodes = np.sum(z > 0.95); leg_nodes = np.sum(z < 0.9)
+        assert(head_nodes > leg_nodes/4)
+        assert(hairpin.get_n() < 0.5*hairpin.get_length()/0.01)
+
+    def test_eddy(self):
+        # splines and straight segments mix in an eddy list
+        xv = np.array([[0.2, 0.1, 0.4], [2.0, 1.0, 0.5]]).T
+        leg = OpenAEM.DLS(np.array([1.0, 0.0, -1.0]), np.array([1.0, 0.0, 0.0]))
+        eddy = [self.ring, leg]
+        assert(OpenAEM.biot_savart_eddy(xv, eddy) == approx(
+            OpenAEM.biot_savart(xv, self.ring) + OpenAEM.biot_savart(xv, leg)))
+        image = OpenAEM.mirror_eddy(eddy)
+        assert(isinstance(image[0], OpenAEM.Spline))
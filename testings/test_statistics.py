@@ -0,0 +1,75 @@
+import numpy as np
+from pytest import approx
+
+import OpenAEM
+
+class Test_Statistics:
+    def setup_method(self):
+        self.rng = np.random.default_rng(1)
+        self.samples = self.rng.normal(size=(3, 6, 5, 4))**2
+
+    def test_moments(self):
+        moments = OpenAEM.RunningMoments(4)
+        for batch in np.array_split(self.samples, 3, axis=1):
+            moments.update(batch)
+        u = self.samples.reshape(3, -1, 4)
+        d = u - u.mean(axis=1, keepdims=True)
+        assert(moments.count == approx(np.full(4, 30.0)))
+        assert(moments.mean == approx(u.mean(axis=1)))
+        assert(moments.stresses() == approx(np.einsum('imk,jmk->ijk', d, d)/30))
+        m2 = np.mean(d**2, axis=1)
+        assert(moments.skewness() == approx(np.mean(d**3, axis=1)/m2**1.5))
+        assert(moments.flatness() == approx(np.mean(d**4, axis=1)/m2**2))
+
+    def test_moments_merge(self):
+        whole = OpenAEM.RunningMoments(4)
+        whole.update(self.samples)
+        a = OpenAEM.RunningMoments(4); b = OpenAEM.RunningMoments(4)
+        a.update(self.samples[:, :2])
+        b.update(self.samples[:, 2:, :, :2], slice(0, 2))
+        b.update(self.samples[:, 2:, :, 2:], slice(2, 4))
+        a.merge(b)
+        for name in ('count', 'mean', 'comoment', 'm3', 'm4'):
+            assert(getattr(a, name) == approx(getattr(whole, name)))
+
+    def test_spectra(self):
+        x = np.arange(6)*0.5; y = np.arange(5)*0.2
+        spectra = OpenAEM.RunningSpectra(x, y, 4)
+        spectra.update(self.samples[..., :2], slice(0, 2))
+        spectra.update(self.samples[..., 2:], slice(2, 4))
+        d = self.samples - self.samples.mean(axis=(1, 2), keepdims=True)
+        for name, (i, j) in OpenAEM.statistics.SPECTRA_COMPONENTS.items():
+            variance = np.mean(d[i]*d[j], axis=(0, 1))
+            assert(spectra.spectrum(name).sum(axis=(0, 1)) == approx(variance))
+            for axis in (0, 1):
+                k, E = spectra.spectrum_1d(name, axis)
+                assert(np.all(k >= 0))
+                assert(E.sum(axis=0) == approx(variance))
+        # a single streamwise mode
+        u = np.zeros((3, 6, 5, 4))
+        u[0] = np.cos(2*np.pi*x/3.0)[:, np.newaxis, np.newaxis]
+        spectra = OpenAEM.RunningSpectra(x, y, 4)
+        spectra.update(u)
+        k, E = spectra.spectrum_1d('E11')
+        assert(k[1] == approx(2*np.pi/3.0))
+        assert(E[:, 0] == approx([0.0, 0.5, 0.0, 0.0]))
+
+    def test_ensemble(self):
+        grid = (np.arange(6)*0.25, np.arange(4)*0.25, np.linspace(0.1, 1.0, 3))
+        eddy = OpenAEM.lambda_packet(n=2)
+        moments, spectra = OpenAEM.ensemble_statistics(
+            grid, eddy, [0.5, 1.0], lam=1.0, realizations=3, seed=4,
+            influence_radius=2.0)
+        assert(moments.count == approx(np.full(3, 72.0)))
+        assert(spectra.count == approx(np.full(3, 3.0)))
+        stresses = moments.stresses()
+        assert(np.all(np.diagonal(stresses).T > 0))
+        # the periodic part of the variance is in the spectra
+        assert(np.all(spectra.spectrum('E11').sum(axis=(0, 1))
+                      <= np.diagonal(stresses)[:, 0] + 1e-12))
+        # a list of DLS is pickled to the workers
+        again, _ = OpenAEM.ensemble_statistics(
+            grid, eddy.to_segments(), [0.5, 1.0], lam=1.0, realizations=3, seed=4,
+            influence_radius=2.0, slab=2, spectra=False, workers=2)
+        assert(again.mean == approx(moments.mean))
+        assert(again.m4 == approx(moments.m4))
@@ -0,0 +1,74 @@
+import numpy as np
+from pytest import approx
+
+import OpenAEM
+
+class Test_Synthesis:
+    def setup_method(self):
+        rng = np.random.default_rng(seed=12345)
+        self.eddy = OpenAEM.lambda_packet(n=2)
+        self.positions = rng.uniform(0, 10, (2, 30))
+        self.heights = rng.uniform(0.2, 1.0, 30)
+        X, Y, Z = np.meshgrid(np.linspace(0, 10, 15), np.linspace(0, 10, 15),
+                              np.linspace(0.05, 1.0, 5), indexing='ij')
+        self.xv = np.vstack((X.ravel(), Y.ravel(), Z.ravel()))
+
+    def test_direct_sum(self):
+        # placed copies carry a circulation proportional to their height
+        placed = OpenAEM.EddyGeometry(np.zeros((3, 0)), np.zeros((3, 0)))
+        for k in range(3):
+            origin = np.array([[self.positions[0, k]], [self.positions[1, k]], [0.0]])
+            h = self.heights[k]
+            placed = placed + OpenAEM.EddyGeometry(h*self.eddy.p0 + origin,
+                                                   h*self.eddy.p1 + origin,
+                                                   gamma=h)
+        uv = OpenAEM.synthesize(self.xv, self.eddy, self.positions[:, :3],
+                                self.heights[:3], r0=0.0,
+                                memory_budget=4096)
+        assert(uv == approx(OpenAEM.biot_savart_eddy(self.xv, placed, r0=0.0)))
+
+    def test_culling(self):
+        uv = OpenAEM.synthesize(self.xv, self.eddy, self.positions, self.heights)
+        uv_culled = OpenAEM.synthesize(self.xv, self.eddy, self.positions,
+                                       self.heights, influence_radius=100.0)
+        assert(uv_culled == approx(uv))
+
+        error = OpenAEM.truncation_error(self.xv, self.eddy, self.positions,
+                                         self.heights, influence_radius=16.0)
+        assert(error['relative'] < 0.02)
+        error_small = OpenAEM.truncation_error(self.xv, self.eddy,
+                                               self.positions, self.heights,
+                                               influence_radius=1.0)
+        assert(error_small['relative'] > error['relative'])
+
+    def test_image(self):
+        eddy = self.eddy + OpenAEM.mirror_eddy(self.eddy)
+        uv = OpenAEM.synthesize(self.xv, eddy, self.positions, self.heights,
+                                influence_radius=4.0)
+        uv_image = OpenAEM.synthesize(self.xv, self.eddy, self.positions,
+                                      self.heights, influence_radius=4.0,
+                                      image=True)
+        assert(uv_image == approx(uv))
+
+    def test_gradient(self):
+        uv, grad = OpenAEM.synthesize(self.xv, self.eddy, self.positions,
+                                      self.heights, influence_radius=4.0,
+                                      gradient=True)
+        h = 1e-6
+        for k in range(3):
+            dx = np.zeros((3, 1)); dx[k] = h
+            du = (OpenAEM.synthesize(self.xv + dx, self.eddy, self.positions,
+                                     self.heights, influence_radius=4.0)
+                  - OpenAEM.synthesize(self.xv - dx, self.eddy, self.positions,
+                                       self.heights, influence_radius=4.0))/(2*h)
+            assert(grad[:, k] == approx(du, rel=1e-4, abs=1e-6))
+
+    def test_transposed_out(self):
+        xv = self.xv.reshape(3, 15, 15, 5)
+        out = np.zeros((5, 15, 15, 3)).transpose(3, 2, 1, 0)
+        uv = OpenAEM.synthesize(xv, self.eddy, self.positions, self.heights,
+                                influence_radius=4.0, out=out)
+        assert(uv is out)
+        assert(np.abs(out).max() > 0)
+        assert(out == approx(OpenAEM.synthesize(xv, self.eddy, self.positions,
+                                                self.heights, influence_radius=4.0)))
@@ -0,0 +1,43 @@
+import numpy as np
+from pytest import approx
+
+import OpenAEM
+
+class Test_Tree_Code:
+    def setup_method(self):
+        rng = np.random.default_rng(seed=12345)
+        eddy = OpenAEM.lambda_packet(n=3)
+        positions = rng.uniform(0, 10, (2, 100))
+        heights = rng.uniform(0.1, 1.0, 100)
+        self.placed = eddy.place(positions, heights)
+        self.xv = rng.uniform(0, 10, (3, 200))
+        self.xv[2] = rng.uniform(0, 1.5, 200)
+        self.uv = OpenAEM.biot_savart_eddy(self.xv, self.placed)
+
+    def test_place(self):
+        eddy = OpenAEM.lambda_packet(n=3)
+        placed = eddy.place(np.array([[1.0, 2.0], [3.0, 4.0]]), [1.0, 0.5])
+        assert(len(placed) == 12)
+        assert(placed.p0[:, 6] == approx(0.5*eddy.p0[:, 0] + np.array([2.0, 4.0, 0.0])))
+        assert(placed.gamma[6] == approx(0.5))
+
+    def test_direct_sum(self):
+        tree = OpenAEM.SegmentTree(self.placed, leaf_size=8)
+        assert(tree.velocity(self.xv, theta=0.0) == approx(self.uv))
+
+    def test_accuracy(self):
+        tree = OpenAEM.SegmentTree(self.placed)
+        error = []
+        for theta in [0.3, 0.6]:
+            uv = OpenAEM.biot_savart_tree(self.xv, tree, theta=theta)
+            error.append(np.linalg.norm(uv - self.uv)/np.linalg.norm(self.uv))
+        assert(error[0] < 0.01)
+        assert(error[0] < error[1])
+
+    def test_transposed_out(self):
+        xv = self.xv.reshape(3, 20, 10)
+        out = np.zeros((10, 20, 3)).transpose(2, 1, 0)
+        uv = OpenAEM.biot_savart_tree(xv, self.placed, theta=0.0, out=out)
+        assert(uv is out)
+        assert(np.abs(out).max() > 0)
+        assert(out == approx(self.uv.reshape(3, 20, 10)))
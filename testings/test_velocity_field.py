@@ -5,4 +5,30 @@ import numpy as np
 class Test_Velocity_Field:
     def test_grid_1d(self):
         x = velocity_field.get_grid_1d(0.0, 1.0, 0.2)
-        assert(x == approx(np.array([0.1, 0.3, 0.5, 0.7, 0.9])))
\ No newline at end of file
+        assert(x == approx(np.array([0.1, 0.3, 0.5, 0.7, 0.9])))
+
+    def test_grid_vectors(self):
+        x, y, z = velocity_field.get_grid(10, 1.0, 1.0, 0.5, 0.5, 1.0, vectors=True)
+        X, Y, Z = velocity_field.get_grid(10, 1.0, 1.0, 0.5, 0.5, 1.0)
+        assert(X.shape == (x.size, y.size, z.size))
+        assert(velocity_field.grid_points((x, y, z), 3, 17)
+               == approx(velocity_field.grid_points((X, Y, Z), 3, 17)))
+
+    def test_grid_1d_stretched(self):
+        for z in (velocity_field.get_grid_1d_tanh(0.0, 1.0, 0.001, 0.01),
+                  velocity_field.get_grid_1d_geometric(0.0, 1.0, 0.001, 0.01)):
+            assert(2*z[0] == approx(0.001, rel=1e-2))
+            assert(np.all(np.diff(z) <= 0.01 + 1e-12))
+            assert(np.all(np.diff(z, 2) >= -1e-12))
+            assert(z[-1] + 0.5*(z[-1] - z[-2]) == approx(1.0, rel=1e-2))
+            assert(z.size < 200)
+
+    def test_stretched_grid(self):
+        x, y, z = velocity_field.get_stretched_grid(1000, 12.0, 2.0, 1.0, 1.0,
+                                                    1.0, 6.0, 1.0, 10.0)
+        assert(x.size == 167 and y.size == 167)
+        # same leading arguments as get_grid
+        uniform = velocity_field.get_grid(1000, 12.0, 2.0, 1.0, 1.0, 1.0, vectors=True)
+        assert(x == approx(uniform[0]))
+        assert(2*z[0] == approx(0.001))
+        assert(z.size < 200)
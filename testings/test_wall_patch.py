@@ -0,0 +1,88 @@
+import numpy as np
+from pytest import approx
+from scipy.spatial import cKDTree
+
+import OpenAEM
+
+class Test_Wall_Patch:
+    def setup_method(self):
+        self.patch = OpenAEM.Wall_Patch(0.0, 20.0, -5.0, 5.0)
+
+    def test_poisson_disk(self):
+        pts = self.patch.place_eddies_poisson_disk(0.2, seed=1)
+        assert(pts.shape[0] == 2)
+        assert(len(cKDTree(pts.T).query_pairs(0.2)) == 0)
+        assert(np.all(pts[0] >= 0.0) and np.all(pts[0] < 20.0))
+        assert(np.all(pts[1] >= -5.0) and np.all(pts[1] < 5.0))
+        # close to the maximal packing density of about 0.6/radius**2
+        assert(pts.shape[1]/self.patch.area() > 0.4/0.2**2)
+
+        again = self.patch.place_eddies_poisson_disk(0.2, seed=1)
+        assert(np.array_equal(pts, again))
+
+    def test_poisson_disk_density(self):
+        pts = self.patch.place_eddies_poisson_disk(0.2, lam=5.0, seed=2)
+        assert(pts.shape[1] == approx(5.0*self.patch.area(), rel=0.15))
+        assert(len(cKDTree(pts.T).query_pairs(0.2)) == 0)
+
+    def test_hierarchies(self):
+        heights = np.array([0.25, 0.5, 1.0])
+        pts, h, levels = self.patch.place_hierarchies(heights, lam=2.0, seed=3)
+        assert(pts.shape == (2, levels.size))
+        assert(np.array_equal(h, heights[levels]))
+        counts = np.bincount(levels, minlength=3)
+        assert(counts == approx(2.0*self.patch.area()/heights**2, rel=0.2))
+
+        pts, h, levels = self.patch.place_hierarchies(heights, lam=2.0, seed=3,
+                                                      radius=0.5)
+        for k, hk in enumerate(heights):
+            level = pts[:, levels == k]
+            assert(len(cKDTree(level.T).query_pairs(0.5*hk)) == 0)
+
+    def test_tiles(self):
+        assert(self.patch.tile_shape(3.0) == (7, 4))
+        last = self.patch.tile(6, 3, 3.0)
+        assert((last.xmax, last.zmax) == (20.0, 5.0))
+
+        pts = self.patch.place_eddies_tiled(4.0, 3.0, seed=7)
+        assert(pts.shape[1] == approx(4.0*self.patch.area(), rel=0.1))
+        assert(np.all(pts[0] < 20.0) and np.all(pts[1] < 5.0))
+
+        # any tile is reproduced alone, in any order
+        tiles = [(5, 2), (0, 0)]
+        subset = self.patch.place_eddies_tiled(4.0, 3.0, seed=7, tiles=tiles)
+        alone = np.hstack([self.patch.place_tile(i, j, 4.0, 3.0, seed=7)
+                           for i, j in tiles])
+        assert(np.array_equal(subset, alone))
+        inside = lambda p, t: ((p[0] >= t.xmin) & (p[0] < t.xmax)
+                               & (p[1] >= t.zmin) & (p[1] < t.zmax))
+        tile = self.patch.tile(5, 2, 3.0)
+        assert(np.array_equal(pts[:, inside(pts, tile)],
+                              self.patch.place_tile(5, 2, 4.0, 3.0, seed=7)))
+
+        other = self.patch.place_tile(5, 2, 4.0, 3.0, seed=7, level=1)
+        assert(not np.array_equal(other, subset[:, :other.shape[1]]))
+
+    def test_periodic_images(self):
+        patch = OpenAEM.Wall_Patch(0.0, 4.0, 0.0, 3.0)
+        eddy = OpenAEM.lambda_packet(n=2)
+        positions, heights, _ = patch.place_hierarchies([0.25, 0.5, 1.0],
+                                                        lam=1.0, seed=2)
+        reach = OpenAEM.influence_reach(eddy, 3.0)[:2]
+        images, image_heights, index = patch.periodic_images(positions, heights,
+                                                             reach)
+        assert(np.array_equal(images[:, :positions.shape[1]], positions))
+        assert(np.array_equal(image_heights, heights[index]))
+        shift = (images - positions[:, index])/np.array([[4.0], [3.0]])
+        assert(shift == approx(np.round(shift)))
+
+        X, Y, Z = np.meshgrid(np.arange(8)*0.5, np.arange(6)*0.5, [0.1, 0.5],
+                              indexing='ij')
+        xv = np.vstack((X.ravel(), Y.ravel(), Z.ravel()))
+        uv = OpenAEM.synthesize(xv, eddy, images, image_heights,
+                                influence_radius=3.0)
+        tiles = np.hstack([positions + np.array([[4.0*i], [3.0*j]])
+                           for i in range(-2, 3) for j in range(-2, 3)])
+        uv_tiled = OpenAEM.synthesize(xv, eddy, tiles, np.tile(heights, 25),
+                                      influence_radius=3.0)
+        assert(uv == approx(uv_tiled))